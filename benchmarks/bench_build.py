@@ -0,0 +1,227 @@
+"""Build benchmarks with synthetic configs and a regression gate.
+
+Runs the real build path (config load, template compile, render, stages,
+write) for configs with 5, 100 and 5,000 tabs and for documentation blocks
+of growing size.  The build caches live in a scratch directory, never the
+repository's ``.cache``.  Every timed run renders from an empty fragment
+cache; the converted content stays cached, as it does between real builds.
+Wall time is the best of --repeat runs; peak memory is measured with
+tracemalloc in one extra run, since tracing slows the build.  Results are
+appended to a JSON history file, benchmarks/history.json by default, which
+is not committed: its numbers only compare against runs on the same machine.
+The run fails when a metric is worse than the best of the recent runs on the
+same machine by more than its threshold.
+
+    python benchmarks/bench_build.py
+    python benchmarks/bench_build.py --cases tabs-5 tabs-100 --stages minify critical_css
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The build reads DASHBOARD_BUILD_CACHE when it is imported, so the scratch
+# cache has to be in place first; main() removes it
+CACHE_ROOT = tempfile.mkdtemp(prefix='dashboard-bench-cache-')
+os.environ['DASHBOARD_BUILD_CACHE'] = CACHE_ROOT
+
+import build_frontend_bank_research_dash as builder  # noqa: E402
+from dashboard_build import templates  # noqa: E402
+
+DEFAULT_HISTORY = os.path.join(ROOT, 'benchmarks', 'history.json')
+
+# name -> (number of tabs, documentation sections repeated this many times)
+CASES = {
+    'tabs-5': (5, 1),
+    'tabs-100': (100, 1),
+    'tabs-5000': (5000, 1),
+    'docs-x10': (5, 10),
+    'docs-x100': (5, 100),
+}
+
+# Allowed relative regression per metric before the run fails
+DEFAULT_THRESHOLDS = {'wall_ms': 0.25, 'compile_ms': 0.5, 'peak_kb': 0.15, 'output_bytes': 0.05}
+
+
+def synthetic_content(content_dir, doc_repeat):
+    # Copy of content/ with every documentation section repeated; each copy
+    # differs so the content cache cannot collapse them
+    shutil.copytree(builder.DEFAULT_CONTENT_DIR, content_dir)
+    documentation = os.path.join(content_dir, 'documentation')
+    sections = [name for name in sorted(os.listdir(documentation)) if not name.startswith('hero.')]
+    for copy in range(1, doc_repeat):
+        for name in sections:
+            with open(os.path.join(documentation, name), 'r', encoding='utf-8') as f:
+                source = f.read()
+            with open(os.path.join(documentation, f'{copy:03d}-{name}'), 'w', encoding='utf-8') as f:
+                f.write(f'<!-- copy {copy} -->\n{source}')
+
+
+def synthetic_config(tabs):
+    with open(os.path.join(ROOT, builder.DEFAULT_CONFIG), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    # Budgets and the audit gate are sized for the real site; a rejected
+    # build would skip the write path being measured
+    config.pop('budgets', None)
+    config.pop('audit', None)
+    base = config['tabs']
+    config['tabs'] = [
+        {'label': f"{base[i % len(base)]['label']} {i + 1}", 'url': f"{base[i % len(base)]['url']}?bench={i}"}
+        for i in range(tabs)
+    ]
+    return config
+
+
+def run_build(config_path, out_dir, options):
+    config = builder.load_config(config_path)
+    result = builder.build(config, out_dir, force=True, **options)
+    if result.rejected:
+        raise RuntimeError(f"{config_path}: build rejected ({'; '.join(result.rejected)})")
+    return sum(len(data) for data in result.outputs.values())
+
+
+def measure(name, tabs, doc_repeat, options, repeat, work_dir):
+    config = synthetic_config(tabs)
+    config['content_dir'] = os.path.join(work_dir, f'{name}-content')
+    synthetic_content(config['content_dir'], doc_repeat)
+    config_path = os.path.join(work_dir, f'{name}.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    out_dir = os.path.join(work_dir, name)
+
+    # Cold template compile into an empty cache
+    cache_dir = os.path.join(work_dir, f'{name}-templates')
+    started = time.perf_counter()
+    templates.precompile(builder.template_sources(), cache_dir)
+    compile_ms = (time.perf_counter() - started) * 1000
+    shutil.rmtree(cache_dir)
+
+    # The first build converts the content; the timed ones reuse the cache
+    # but render every fragment again
+    run_build(config_path, out_dir, options)
+    times = []
+    for _ in range(repeat):
+        shutil.rmtree(templates.DEFAULT_FRAGMENT_CACHE_DIR, ignore_errors=True)
+        started = time.perf_counter()
+        output_bytes = run_build(config_path, out_dir, options)
+        times.append((time.perf_counter() - started) * 1000)
+
+    shutil.rmtree(templates.DEFAULT_FRAGMENT_CACHE_DIR, ignore_errors=True)
+    tracemalloc.start()
+    run_build(config_path, out_dir, options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'wall_ms': round(min(times), 2),
+        'compile_ms': round(compile_ms, 2),
+        'peak_kb': round(peak / 1024, 1),
+        'output_bytes': output_bytes,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def regressions(history, entry, thresholds, window):
+    # Compare each metric with the best value of the last `window` runs made
+    # on the same machine with the same stages
+    previous = [run for run in history if run['machine'] == entry['machine'] and run['options'] == entry['options']]
+    previous = previous[-window:]
+    found = []
+    for case, metrics in entry['results'].items():
+        for metric, value in metrics.items():
+            baseline = [run['results'][case][metric] for run in previous if case in run['results']]
+            if not baseline or metric not in thresholds:
+                continue
+            best = min(baseline)
+            if best and value > best * (1 + thresholds[metric]):
+                found.append((case, metric, best, value))
+    return found
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard build.')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--stages', nargs='*', choices=sorted(builder.DEFAULT_OPTIONS), default=[],
+                        help='optional build stages to switch on')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case (default: %(default)s)')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='results history (default: %(default)s)')
+    parser.add_argument('--window', type=int, default=5, help='recent runs to compare against (default: %(default)s)')
+    parser.add_argument('--no-record', action='store_true', help='compare but do not append to the history')
+    for metric, threshold in DEFAULT_THRESHOLDS.items():
+        parser.add_argument(f"--max-{metric.replace('_', '-')}-regression", type=float, default=threshold,
+                            dest=f'threshold_{metric}', help=f'relative limit (default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def warm_up(work_dir):
+    # Import Jinja2 and its compiler before anything is timed, so the first
+    # case does not pay for it
+    templates.precompile(builder.template_sources(), os.path.join(work_dir, 'warm-up'))
+
+
+def main(argv=None):
+    try:
+        return run(parse_args(argv))
+    finally:
+        shutil.rmtree(CACHE_ROOT, ignore_errors=True)
+
+
+def run(args):
+    options = {name: name in args.stages for name in builder.DEFAULT_OPTIONS}
+    thresholds = {metric: getattr(args, f'threshold_{metric}') for metric in DEFAULT_THRESHOLDS}
+    entry = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'revision': git_revision(),
+        'machine': f'{platform.node()} {platform.machine()} python {platform.python_version()}',
+        'options': sorted(args.stages),
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='dashboard-bench-') as work_dir:
+        warm_up(work_dir)
+        for name in args.cases:
+            tabs, doc_repeat = CASES[name]
+            result = measure(name, tabs, doc_repeat, options, args.repeat, work_dir)
+            entry['results'][name] = result
+            print(
+                f"{name:<10} {result['wall_ms']:>10.1f} ms  compile {result['compile_ms']:>7.1f} ms"
+                f"  peak {result['peak_kb'] / 1024:>7.1f} MB  output {result['output_bytes']:>12,} bytes"
+            )
+
+    history = load_history(args.history)
+    found = regressions(history, entry, thresholds, args.window)
+    if not args.no_record:
+        history.append(entry)
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+            f.write('\n')
+    for case, metric, best, value in found:
+        print(f'REGRESSION {case} {metric}: {value:,} vs best {best:,} (+{(value / best - 1) * 100:.0f}%)')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
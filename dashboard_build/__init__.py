@@ -0,0 +1,2 @@
+# Build stages for the institutional dashboard site generated by
+# build_frontend_bank_research_dash.py.
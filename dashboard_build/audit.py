@@ -0,0 +1,155 @@
+"""Offline static performance audit of a built page.
+
+A Lighthouse-style pass over the final HTML, without a browser.  It counts
+render-blocking resources in ``<head>``, third-party origins, DOM nodes and
+depth, bytes of inline ``data:`` URIs, images without dimensions, iframes
+without ``loading="lazy"``, and dashboard tabs linked from both the sidebar
+``.nav-menu`` and the ``.tab-buttons`` bar.  Each metric is scored between a
+good and a poor value, and the weighted mean gives a 0-100 score.  Builds
+write the report to ``.audit.json`` in the output directory.
+
+    python -m dashboard_build.audit docs/index.html
+"""
+import json
+import sys
+from urllib.parse import urlsplit
+
+from dashboard_build.markup import DATA_URI_RE, ElementStack
+
+REPORT_NAME = '.audit.json'
+URL_ATTRIBUTES = ('src', 'href', 'data-embed-src')
+
+# metric -> (good value, poor value, weight); good scores 1, poor or worse 0
+METRICS = {
+    'render_blocking': (0, 4, 3),
+    'third_party_origins': (2, 8, 2),
+    'dom_nodes': (800, 1500, 2),
+    'dom_depth': (20, 32, 1),
+    'data_uri_bytes': (4096, 65536, 2),
+    'images_without_dimensions': (0, 3, 1),
+    'iframes_without_lazy_loading': (0, 3, 1),
+    'duplicate_nav_entries': (0, 20, 1),
+}
+
+
+class PageAudit(ElementStack):
+    def __init__(self):
+        super().__init__()
+        self.in_head = False
+        self.nodes = 0
+        self.depth = 0
+        self.render_blocking = []
+        self.origins = set()
+        self.images_without_dimensions = []
+        self.eager_iframes = []
+        self.nav_targets = {'nav-menu': set(), 'tab-buttons': set()}
+
+    def _inside(self, class_name):
+        return any(class_name in (dict(attrs).get('class') or '').split() for _, attrs in self.stack)
+
+    def start(self, tag, attrs):
+        values = dict(attrs)
+        self.nodes += 1
+        self.depth = max(self.depth, len(self.stack) + 1)
+        if tag == 'head':
+            self.in_head = True
+        elif tag == 'body':
+            self.in_head = False
+
+        for name in URL_ATTRIBUTES:
+            parts = urlsplit(values.get(name) or '')
+            if parts.scheme in ('http', 'https') and parts.netloc and not (tag == 'a' and name == 'href'):
+                self.origins.add(f'{parts.scheme}://{parts.netloc.lower()}')
+
+        noscript = any(name == 'noscript' for name, _ in self.stack)
+        if self.in_head and not noscript:
+            rel = (values.get('rel') or '').lower().split()
+            if tag == 'link' and 'stylesheet' in rel and values.get('media', 'all') in ('all', 'screen', ''):
+                self.render_blocking.append(values.get('href'))
+            elif tag == 'script' and values.get('src') and not ({'async', 'defer'} & set(values)) \
+                    and values.get('type') != 'module':
+                self.render_blocking.append(values.get('src'))
+        if tag == 'img' and not (values.get('width') and values.get('height')):
+            self.images_without_dimensions.append(values.get('src'))
+        if tag == 'iframe' and values.get('loading') != 'lazy':
+            self.eager_iframes.append(values.get('src'))
+        if values.get('data-tab'):
+            for container in self.nav_targets:
+                if self._inside(container):
+                    self.nav_targets[container].add(values['data-tab'])
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.in_head = False
+        super().handle_endtag(tag)
+
+
+def score_metric(value, good, poor):
+    if value <= good:
+        return 1.0
+    if value >= poor:
+        return 0.0
+    return round(1 - (value - good) / (poor - good), 3)
+
+
+def audit_page(html, page_origin=None):
+    # Returns the machine-readable report; page_origin, when known, is not
+    # counted as a third party
+    parser = PageAudit()
+    parser.feed(html)
+    parser.close()
+    return audit_report(parser, data_uri_bytes(html), page_origin)
+
+
+def data_uri_bytes(html):
+    return sum(len(uri) for uri in DATA_URI_RE.findall(html))
+
+
+def audit_report(parser, data_uris, page_origin=None):
+    # Report for a parser that has been fed the whole page, possibly in
+    # chunks while it was streamed to disk
+    origins = sorted(parser.origins - {page_origin})
+    duplicates = sorted(parser.nav_targets['nav-menu'] & parser.nav_targets['tab-buttons'])
+    values = {
+        'render_blocking': len(parser.render_blocking),
+        'third_party_origins': len(origins),
+        'dom_nodes': parser.nodes,
+        'dom_depth': parser.depth,
+        'data_uri_bytes': data_uris,
+        'images_without_dimensions': len(parser.images_without_dimensions),
+        'iframes_without_lazy_loading': len(parser.eager_iframes),
+        'duplicate_nav_entries': len(duplicates),
+    }
+    metrics = {}
+    for name, (good, poor, weight) in METRICS.items():
+        metrics[name] = {'value': values[name], 'score': score_metric(values[name], good, poor),
+                         'good': good, 'poor': poor, 'weight': weight}
+    total_weight = sum(weight for _, _, weight in METRICS.values())
+    score = round(100 * sum(metric['score'] * metric['weight'] for metric in metrics.values()) / total_weight)
+    return {
+        'score': score,
+        'metrics': metrics,
+        'details': {
+            'render_blocking': parser.render_blocking,
+            'third_party_origins': origins,
+            'images_without_dimensions': parser.images_without_dimensions,
+            'iframes_without_lazy_loading': parser.eager_iframes,
+            'duplicate_nav_entries': duplicates,
+        },
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print('usage: python -m dashboard_build.audit PAGE.html', file=sys.stderr)
+        return 2
+    with open(argv[0], 'r', encoding='utf-8') as f:
+        report = audit_page(f.read())
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
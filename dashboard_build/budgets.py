@@ -0,0 +1,93 @@
+"""Page-weight breakdown and budgets.
+
+Splits the built page into sections (inline CSS, inline JS, inline images,
+the documentation tab, the dashboard tab panes), adds up the other assets
+and counts the third-party requests the initial page makes.  Sections are
+compared with the ``budgets`` declared in config.json, in bytes
+(``third_party_requests`` is a count), and with the previously built page.
+"""
+import re
+
+from dashboard_build.markup import COMPRESSED_SUFFIXES, DATA_URI_RE, parse_attrs
+
+STYLE_RE = re.compile(r'<style\b[^>]*>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+INLINE_SCRIPT_RE = re.compile(r'<script\b(?![^>]*\bsrc=)[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+REQUEST_TAG_RE = re.compile(r'<(link|script|img|source)\b[^>]*>', re.IGNORECASE)
+NOSCRIPT_RE = re.compile(r'<noscript\b.*?</noscript>', re.IGNORECASE | re.DOTALL)
+TAB_ID_RE = re.compile(r'<div\b[^>]*\bid="(tab-\d+)"', re.IGNORECASE)
+
+SECTIONS = ('html', 'inline_css', 'inline_js', 'inline_images', 'documentation', 'tabs', 'assets', 'total',
+            'third_party_requests')
+
+
+def _size(text):
+    return len(text.encode('utf-8'))
+
+
+def element_span(html, element_id):
+    # (start, end) of the element with this id, matching nested same-name tags
+    opening = re.search(rf'<(\w+)\b[^>]*\bid="{re.escape(element_id)}"[^>]*>', html)
+    if not opening:
+        return None
+    return opening.start(), element_end(html, opening.start(), opening.group(1))
+
+
+def element_end(html, start, tag):
+    depth = 0
+    for match in re.compile(rf'<(/?){tag}\b[^>]*>', re.IGNORECASE).finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+    return len(html)
+
+
+def third_party_requests(html):
+    # Absolute URLs the page fetches on load; hints and <noscript> fallbacks
+    # do not count
+    urls = set()
+    for match in REQUEST_TAG_RE.finditer(NOSCRIPT_RE.sub('', html)):
+        attrs = dict(parse_attrs(match.group(0)))
+        if match.group(1).lower() == 'link':
+            rel = (attrs.get('rel') or '').lower().split()
+            if not {'stylesheet', 'preload', 'icon', 'modulepreload'} & set(rel):
+                continue
+            candidates = [attrs.get('href')]
+        else:
+            candidates = [attrs.get('src')] + [part.split()[0] for part in (attrs.get('srcset') or '').split(',')
+                                               if part.strip()]
+        urls.update(url for url in candidates if url and re.match(r'(https?:)?//', url))
+    return sorted(urls)
+
+
+def size_breakdown(html, output_sizes):
+    # output_sizes maps output names to byte counts; precompressed variants
+    # are skipped
+    documentation = element_span(html, 'documentation')
+    tabs = {}
+    for match in TAB_ID_RE.finditer(html):
+        tabs[match.group(1)] = _size(html[match.start():element_end(html, match.start(), 'div')])
+    assets = sum(size for name, size in output_sizes.items()
+                 if name != 'index.html' and not name.endswith(COMPRESSED_SUFFIXES))
+    html_bytes = _size(html)
+    return {
+        'html': html_bytes,
+        'inline_css': sum(_size(block) for block in STYLE_RE.findall(html)),
+        'inline_js': sum(_size(block) for block in INLINE_SCRIPT_RE.findall(html)),
+        'inline_images': sum(len(uri) for uri in DATA_URI_RE.findall(html)),
+        'documentation': _size(html[documentation[0]:documentation[1]]) if documentation else 0,
+        'tabs': sum(tabs.values()),
+        'tab_sizes': tabs,
+        'assets': assets,
+        'total': html_bytes + assets,
+        'third_party_requests': len(third_party_requests(html)),
+    }
+
+
+def check_budgets(sizes, budgets):
+    # [(section, size, budget)] for every section over its budget
+    unknown = set(budgets) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"unknown budget section(s): {', '.join(sorted(unknown))}")
+    # Sections a streamed build could not measure are not checked
+    return [(section, sizes[section], budget) for section, budget in budgets.items()
+            if section in sizes and sizes[section] > budget]
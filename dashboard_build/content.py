@@ -0,0 +1,219 @@
+"""Documentation and Overview prose kept as Markdown and HTML source files.
+
+Each page is a directory under ``content/`` (``overview``, ``documentation``)
+whose ``.md`` and ``.html`` files are its sections, in file name order.  The
+banner above both pages is described once in ``content/hero.json``: the
+subtitle and metrics they share and a title per page.  Markdown is
+converted with the ``markdown`` package (``md_in_html`` lets a file wrap
+itself in ``<div class="section-card" markdown="1">``), and every section is
+sanitized: scripts, frames, forms, event handler attributes and
+``javascript:`` URLs are dropped.  Converted sections are stored under the
+hash of their source, so an unchanged file is never converted again, by this
+build or by any later build sharing the cache.
+"""
+import importlib.util
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+from dashboard_build.manifest import CACHE_ROOT, atomic_open, hash_file, hash_text
+
+DEFAULT_CACHE_DIR = os.path.join(CACHE_ROOT, 'content')
+PAGES = ('overview', 'documentation')
+SOURCE_SUFFIXES = ('.md', '.html')
+HERO_FILE = 'hero.json'
+MARKDOWN_EXTENSIONS = ('md_in_html', 'tables', 'def_list')
+# Bump when conversion or sanitizing changes, so cached sections are redone
+CONVERTER_VERSION = 2
+
+# Elements dropped together with their content
+DROPPED_TAGS = {'script', 'style', 'iframe', 'frame', 'frameset', 'object', 'embed', 'applet', 'form', 'template',
+                'button', 'select', 'textarea'}
+# Void elements dropped; they have no content
+DROPPED_VOID_TAGS = {'base', 'link', 'meta', 'input'}
+URL_ATTRIBUTES = {'href', 'src', 'action', 'formaction', 'xlink:href', 'poster', 'background'}
+UNSAFE_URL_RE = re.compile(r'^\s*(javascript|vbscript|data(?!:image/(png|jpeg|gif|webp|avif)[;,])):', re.IGNORECASE)
+
+# cache key -> converted section, for batch workers building several sites
+_converted = {}
+_converter_versions = {}
+
+
+class Sanitizer(HTMLParser):
+    # Re-serializes the source, keeping the original text of every tag it
+    # does not have to change
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.skipping = []
+        self.removed = 0
+
+    def _tag(self, tag, attrs, closing=''):
+        safe = [(name, value) for name, value in attrs
+                if not name.startswith('on') and not (name in URL_ATTRIBUTES and UNSAFE_URL_RE.match(value or ''))]
+        if len(safe) == len(attrs):
+            return self.get_starttag_text()
+        self.removed += len(attrs) - len(safe)
+        rendered = ''.join(f' {name}' if value is None else f' {name}="{escape_attr(value)}"' for name, value in safe)
+        return f'<{tag}{rendered}{closing}>'
+
+    def handle_starttag(self, tag, attrs):
+        if self.skipping or tag in DROPPED_TAGS:
+            if tag in DROPPED_TAGS:
+                self.skipping.append(tag)
+                self.removed += 1
+            return
+        if tag in DROPPED_VOID_TAGS:
+            self.removed += 1
+            return
+        self.out.append(self._tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        if self.skipping or tag in DROPPED_TAGS or tag in DROPPED_VOID_TAGS:
+            self.removed += not self.skipping
+            return
+        self.out.append(self._tag(tag, attrs, ' /'))
+
+    def handle_endtag(self, tag):
+        if self.skipping:
+            if tag == self.skipping[-1]:
+                self.skipping.pop()
+            return
+        if tag not in DROPPED_VOID_TAGS:
+            self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.out.append(data)
+
+    def handle_entityref(self, name):
+        if not self.skipping:
+            self.out.append(f'&{name};')
+
+    def handle_charref(self, name):
+        if not self.skipping:
+            self.out.append(f'&#{name};')
+
+    def handle_comment(self, data):
+        self.removed += 1
+
+    def handle_decl(self, decl):
+        self.removed += 1
+
+    def unknown_decl(self, data):
+        self.removed += 1
+
+
+def escape_attr(value):
+    return value.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;')
+
+
+def sanitize(html):
+    # Returns (html, number of elements, attributes and comments removed)
+    parser = Sanitizer()
+    parser.feed(html)
+    parser.close()
+    return ''.join(parser.out), parser.removed
+
+
+def markdown_version():
+    # Identifies the installed markdown package by its version module, read
+    # rather than imported: the import alone costs more than loading every
+    # cached section
+    if 'markdown' not in _converter_versions:
+        spec = importlib.util.find_spec('markdown')
+        if spec is None or not spec.origin:
+            version = None
+        else:
+            version = hash_file(os.path.join(os.path.dirname(spec.origin), '__meta__.py')) or spec.origin
+        _converter_versions['markdown'] = version
+    return _converter_versions['markdown']
+
+
+def convert(source, suffix):
+    if suffix == '.md':
+        try:
+            import markdown
+        except ImportError:
+            raise RuntimeError('Markdown content needs the markdown package: pip install markdown') from None
+        source = markdown.markdown(source, extensions=list(MARKDOWN_EXTENSIONS))
+    html, _ = sanitize(source)
+    return html.strip() + '\n'
+
+
+def cache_key(source, suffix):
+    converter = f'markdown={markdown_version()}' if suffix == '.md' else 'html'
+    return hash_text(f'{CONVERTER_VERSION}\0{converter}\0{suffix}\0{source}')[:24]
+
+
+def cached_section(source, suffix, cache_dir):
+    # Returns (html, converted_now)
+    key = cache_key(source, suffix)
+    if key in _converted:
+        return _converted[key], False
+    path = os.path.join(cache_dir, f'{key}.html')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = _converted[key] = f.read()
+        return html, False
+    except OSError:
+        pass
+    html = _converted[key] = convert(source, suffix)
+    # Parallel batch workers may store the same section; the copies are equal
+    # and the rename keeps a reader from seeing half of one
+    with atomic_open(path) as f:
+        f.write(html.encode('utf-8'))
+    return html, True
+
+
+def source_files(content_dir):
+    # The banner and the section source files of every page, in the order
+    # they are rendered
+    hero = os.path.join(content_dir, HERO_FILE)
+    paths = [hero] if os.path.isfile(hero) else []
+    for page in PAGES:
+        page_dir = os.path.join(content_dir, page)
+        try:
+            names = sorted(os.listdir(page_dir))
+        except FileNotFoundError:
+            continue
+        paths += [os.path.join(page_dir, name) for name in names if name.endswith(SOURCE_SUFFIXES)]
+    return paths
+
+
+def load_heroes(content_dir):
+    # Banner of each page as {'title', 'subtitle', 'metrics'}; pages without
+    # a title in hero.json get none
+    try:
+        with open(os.path.join(content_dir, HERO_FILE), 'r', encoding='utf-8') as f:
+            hero = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {
+        page: {'title': title, 'subtitle': hero.get('subtitle', ''), 'metrics': hero.get('metrics', [])}
+        for page, title in hero.get('titles', {}).items()
+    }
+
+
+def load_content(content_dir, cache_dir=DEFAULT_CACHE_DIR):
+    # Returns (pages, report) where pages maps each page name to
+    # {'hero': banner or None, 'sections': html}
+    heroes = load_heroes(content_dir)
+    pages = {page: {'hero': heroes.get(page), 'sections': ''} for page in PAGES}
+    report = {'sections': 0, 'converted': 0, 'cached': 0, 'converted_files': []}
+    for path in source_files(content_dir):
+        page = os.path.basename(os.path.dirname(path))
+        suffix = os.path.splitext(path)[1]
+        if suffix not in SOURCE_SUFFIXES:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        html, converted = cached_section(source, suffix, cache_dir)
+        sections = pages[page]['sections']
+        pages[page]['sections'] = html if not sections else sections + '\n' + html
+        report['sections'] += 1
+        report['converted' if converted else 'cached'] += 1
+        if converted:
+            report['converted_files'].append(os.path.relpath(path, content_dir).replace(os.sep, '/'))
+    return pages, report
@@ -0,0 +1,107 @@
+"""Critical CSS inlining.
+
+Computes the subset of the site stylesheet needed to paint the
+above-the-fold regions of the page (by default the header, the sidebar,
+the tab bar, the active Overview tab and the fixed dark-mode toggle),
+inlines it in ``<head>`` and turns every ``<link rel="stylesheet">`` into a
+non-blocking preload that swaps itself in on load, with a ``<noscript>``
+fallback.
+"""
+import re
+
+from dashboard_build.css import parse_stylesheet, purge, serialize
+from dashboard_build.markup import HEAD_END_RE, VOID_TAGS, DomTokens, format_tag, parse_attrs, remove_attr, set_attr
+
+DEFAULT_ROOTS = ('header', '.sidebar', '.tab-buttons', '#home', '.dark-mode-toggle')
+
+LINK_RE = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+
+
+class CriticalTokens(DomTokens):
+    # Tags, ids, classes and attributes of every element inside one of the
+    # critical roots, plus the ancestors of those roots
+    def __init__(self, roots):
+        super().__init__()
+        self.roots = roots
+        # Stack index of the open root; roots inside it are not roots again
+        self.root_depth = None
+
+    def _is_root(self, tag, attrs):
+        values = dict(attrs)
+        classes = (values.get('class') or '').split()
+        for root in self.roots:
+            if root.startswith('.') and root[1:] in classes:
+                return True
+            if root.startswith('#') and values.get('id') == root[1:]:
+                return True
+            if root == tag:
+                return True
+        return False
+
+    def start(self, tag, attrs):
+        if self.root_depth is not None:
+            self.record(tag, attrs)
+        elif self._is_root(tag, attrs):
+            for ancestor_tag, ancestor_attrs in self.stack:
+                self.record(ancestor_tag, ancestor_attrs)
+            self.record(tag, attrs)
+            if tag not in VOID_TAGS:
+                self.root_depth = len(self.stack)
+
+    def end(self, tag, attrs, depth):
+        if depth == self.root_depth:
+            self.root_depth = None
+
+
+def critical_stylesheet(html, stylesheet, roots=DEFAULT_ROOTS):
+    parser = CriticalTokens(roots)
+    parser.feed(html)
+    parser.close()
+    return serialize(purge(parse_stylesheet(stylesheet), parser))
+
+
+def defer_stylesheets(html):
+    # Rewrites every stylesheet link into a preload that applies itself on
+    # load, keeping the original link in <noscript> for script-less clients.
+    # Returns (html, number of links deferred).
+    deferred = []
+
+    def rewrite(match):
+        attrs = parse_attrs(match.group(0))
+        values = dict(attrs)
+        if (values.get('rel') or '').lower() != 'stylesheet' or values.get('media') == 'print':
+            return match.group(0)
+        fallback = match.group(0)
+        set_attr(attrs, 'rel', 'preload')
+        set_attr(attrs, 'as', 'style')
+        remove_attr(attrs, 'onload')
+        attrs.append(('onload', "this.onload=null;this.rel='stylesheet'"))
+        deferred.append(values.get('href'))
+        return f'{format_tag("link", attrs)}<noscript>{fallback}</noscript>'
+
+    head_end = HEAD_END_RE.search(html)
+    if not head_end:
+        return html, 0
+    head, rest = html[:head_end.start()], html[head_end.start():]
+    return LINK_RE.sub(rewrite, head) + rest, len(deferred)
+
+
+def inline_critical_css(html, stylesheet, roots=DEFAULT_ROOTS):
+    # Returns (html, report)
+    critical = critical_stylesheet(html, stylesheet, roots)
+    html, deferred = defer_stylesheets(html)
+    head_end = HEAD_END_RE.search(html)
+    # Inline styles go before the first preload so they apply immediately;
+    # connection hints stay ahead of them
+    position = head_end.start()
+    for link in LINK_RE.finditer(html, 0, head_end.start()):
+        if not {'preconnect', 'dns-prefetch'} & set((dict(parse_attrs(link.group(0))).get('rel') or '').lower().split()):
+            position = link.start()
+            break
+    html = f'{html[:position]}<style>\n{critical}</style>\n    {html[position:]}'
+    report = {
+        'critical_bytes': len(critical.encode('utf-8')),
+        'stylesheet_bytes': len(stylesheet.encode('utf-8')),
+        'deferred_links': deferred,
+    }
+    return html, report
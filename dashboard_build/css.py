@@ -0,0 +1,235 @@
+"""Stylesheet extraction and purging.
+
+The inline ``<style>`` blocks of the rendered page are parsed into rules,
+selectors that cannot match anything in the rendered DOM are dropped, and
+the remainder is emitted as a content-hashed stylesheet linked from the
+page.  Class names toggled from inline scripts (``dark-mode``,
+``sidebar-collapsed``, ...) count as used, and a config safelist covers
+anything the scan cannot see.
+"""
+import re
+
+from dashboard_build.manifest import hash_text
+from dashboard_build.markup import DomTokens
+
+ASSET_DIR = 'assets/css'
+
+# At-rules whose block holds ordinary rules that can be purged individually
+GROUPING_AT_RULES = {'media', 'supports', 'layer', 'container', 'document'}
+
+STYLE_BLOCK_RE = re.compile(r'<style\b([^>]*)>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+SCRIPT_BLOCK_RE = re.compile(r'<script\b[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+JS_STRING_RE = re.compile(r'"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'|`((?:[^`\\]|\\.)*)`')
+PSEUDO_RE = re.compile(r'::?[a-zA-Z-]+(\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE_RE = re.compile(r'\[\s*([\w-]+)[^\]]*\]')
+COMBINATOR_RE = re.compile(r'\s*[>+~]\s*|\s+')
+COMMENT_RE = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|/\*.*?(?:\*/|$)', re.DOTALL)
+
+
+class Rule:
+    def __init__(self, selectors, body):
+        self.selectors = selectors
+        self.body = body
+
+    def to_css(self):
+        return f"{', '.join(self.selectors)} {{{self.body}}}"
+
+
+class AtRule:
+    # children is a list of nodes for grouping rules, otherwise body holds the
+    # raw block (None for statement at-rules such as @import)
+    def __init__(self, prelude, body=None, children=None):
+        self.prelude = prelude
+        self.body = body
+        self.children = children
+
+    @property
+    def name(self):
+        return self.prelude[1:].split(None, 1)[0].lower() if len(self.prelude) > 1 else ''
+
+    def to_css(self):
+        if self.children is not None:
+            inner = '\n'.join(child.to_css() for child in self.children)
+            return f'{self.prelude} {{\n{inner}\n}}'
+        if self.body is None:
+            return f'{self.prelude};'
+        return f'{self.prelude} {{{self.body}}}'
+
+
+def strip_comments(css):
+    # Comments inside string literals are kept
+    return COMMENT_RE.sub(lambda match: match.group(1) or '', css)
+
+
+def _block_end(css, start):
+    # Index of the brace closing the block opened just before start
+    depth = 1
+    quote = None
+    i = start
+    while i < len(css):
+        char = css[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def split_selectors(prelude):
+    selectors = []
+    depth = 0
+    current = []
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            selectors.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    selectors.append(''.join(current).strip())
+    return [' '.join(selector.split()) for selector in selectors if selector]
+
+
+def parse_stylesheet(css, _comments_stripped=False):
+    if not _comments_stripped:
+        css = strip_comments(css)
+    nodes = []
+    i = 0
+    while i < len(css):
+        brace = css.find('{', i)
+        semicolon = css.find(';', i)
+        prelude_end = brace if brace != -1 else len(css)
+        prelude = css[i:prelude_end].strip()
+        if prelude.startswith('@') and semicolon != -1 and (brace == -1 or semicolon < brace):
+            nodes.append(AtRule(' '.join(css[i:semicolon].split())))
+            i = semicolon + 1
+            continue
+        if brace == -1:
+            break
+        end = _block_end(css, brace + 1)
+        body = css[brace + 1:end]
+        prelude = ' '.join(prelude.split())
+        if prelude.startswith('@'):
+            at_rule = AtRule(prelude)
+            if at_rule.name in GROUPING_AT_RULES:
+                at_rule.children = parse_stylesheet(body, _comments_stripped=True)
+            else:
+                at_rule.body = body
+            nodes.append(at_rule)
+        elif prelude:
+            nodes.append(Rule(split_selectors(prelude), body))
+        i = end + 1
+    return nodes
+
+
+def serialize(nodes):
+    return '\n'.join(node.to_css() for node in nodes) + '\n'
+
+
+def collect_dom_tokens(html, safelist=()):
+    parser = DomTokens()
+    parser.feed(html)
+    parser.close()
+    # Identifier-like words inside script string literals: classes and ids
+    # added at runtime through classList or getElementById
+    for script in SCRIPT_BLOCK_RE.findall(html):
+        for match in JS_STRING_RE.finditer(script):
+            literal = next(group for group in match.groups() if group is not None)
+            for word in re.findall(r'[A-Za-z_][\w-]*', literal):
+                parser.classes.add(word)
+                parser.ids.add(word)
+    for name in safelist:
+        parser.classes.add(name.lstrip('.#'))
+        parser.ids.add(name.lstrip('.#'))
+    return parser
+
+
+def selector_matches(selector, dom):
+    # Conservative: a selector is kept unless one of its simple parts names
+    # a tag, class, id or attribute that never appears in the document
+    bare = PSEUDO_RE.sub('', selector)
+    for attribute in ATTRIBUTE_RE.findall(bare):
+        if attribute.lower() not in dom.attributes:
+            return False
+    bare = ATTRIBUTE_RE.sub('', bare)
+    for compound in COMBINATOR_RE.split(bare):
+        if not compound or compound == '*':
+            continue
+        tag = re.match(r'[a-zA-Z][\w-]*', compound)
+        if tag and tag.group(0).lower() not in dom.tags:
+            return False
+        for kind, name in re.findall(r'([.#])((?:[\w-]|\\.)+)', compound):
+            if name not in (dom.classes if kind == '.' else dom.ids):
+                return False
+    return True
+
+
+def purge(nodes, dom):
+    kept = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = [selector for selector in node.selectors if selector_matches(selector, dom)]
+            if selectors:
+                kept.append(Rule(selectors, node.body))
+        elif node.children is not None:
+            children = purge(node.children, dom)
+            if children:
+                kept.append(AtRule(node.prelude, children=children))
+        else:
+            kept.append(node)
+    return kept
+
+
+def extract_stylesheet(html, purge_unused=True, safelist=(), name='site', minify=False):
+    # Returns (html, assets, report). Only plain <style> blocks are moved;
+    # blocks with a media attribute are left inline.
+    blocks = [match for match in STYLE_BLOCK_RE.finditer(html) if 'media' not in match.group(1).lower()]
+    if not blocks:
+        return html, {}, None
+    original = '\n'.join(match.group(2) for match in blocks)
+    nodes = original_nodes = parse_stylesheet(original)
+    if purge_unused:
+        without_styles = STYLE_BLOCK_RE.sub('', html)
+        nodes = purge(nodes, collect_dom_tokens(without_styles, safelist))
+    stylesheet = serialize(nodes)
+    if minify:
+        from dashboard_build.minify import minify_css
+
+        stylesheet = minify_css(stylesheet) + '\n'
+    path = f'{ASSET_DIR}/{name}.{hash_text(stylesheet)[:10]}.css'
+
+    pieces = []
+    position = 0
+    for index, match in enumerate(blocks):
+        pieces.append(html[position:match.start()])
+        if index == 0:
+            pieces.append(f'<link rel="stylesheet" href="{path}">')
+        position = match.end()
+    pieces.append(html[position:])
+
+    report = {
+        'path': path,
+        'inline_bytes': len(original.encode('utf-8')),
+        'stylesheet_bytes': len(stylesheet.encode('utf-8')),
+        'rules_before': count_rules(original_nodes),
+        'rules_after': count_rules(nodes),
+    }
+    return ''.join(pieces), {path: stylesheet.encode('utf-8')}, report
+
+
+def count_rules(nodes):
+    return sum(count_rules(node.children) if isinstance(node, AtRule) and node.children is not None else 1
+               for node in nodes)
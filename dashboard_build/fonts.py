@@ -0,0 +1,285 @@
+"""Self-hosted, subsetted web fonts.
+
+Works out which families and weights the page actually uses (from the
+Google Fonts links, the stylesheet and the rendered markup) and which
+characters it renders.  When local font files for a family are available
+in the configured source directory and fontTools is installed, each used
+weight is subset to those characters and emitted as a hashed WOFF2 file
+(WOFF without the brotli package) with an ``@font-face`` rule using
+``font-display: swap``; weights needed above the fold are preloaded.  Families without local sources keep their
+Google Fonts link, trimmed to the weights that are used.
+"""
+import logging
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from dashboard_build.css import AtRule, Rule, parse_stylesheet
+from dashboard_build.manifest import hash_bytes
+from dashboard_build.markup import HEAD_END_RE, parse_attrs
+
+ASSET_DIR = 'assets/fonts'
+FONT_EXTENSIONS = ('.ttf', '.otf', '.woff', '.woff2')
+BOLD_TAGS = {'b', 'strong', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'th', 'dt'}
+WEIGHT_KEYWORDS = {'normal': 400, 'bold': 700}
+TEXT_ATTRIBUTES = {'alt', 'title', 'placeholder', 'aria-label', 'value'}
+
+GOOGLE_LINK_RE = re.compile(r'[ \t]*<link\b[^>]*fonts\.googleapis\.com/css2?[^>]*>\n?', re.IGNORECASE)
+SCRIPT_STRING_RE = re.compile(r'"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'')
+
+
+class PageText(HTMLParser):
+    # Characters rendered by the page and tags that default to bold
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chars = set()
+        self.tags = set()
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.add(tag)
+        if tag in ('script', 'style'):
+            self.skip += 1
+        for name, value in attrs:
+            if name in TEXT_ATTRIBUTES and value:
+                self.chars.update(value)
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if self.skip:
+            # Labels set from inline scripts are rendered too
+            for match in SCRIPT_STRING_RE.finditer(data):
+                self.chars.update(match.group(1) or match.group(2) or '')
+        else:
+            self.chars.update(data)
+
+
+def google_families(html):
+    # {family: (link tag, [weights])} for every Google Fonts stylesheet link
+    families = {}
+    for match in GOOGLE_LINK_RE.finditer(html):
+        href = dict(parse_attrs(match.group(0).strip())).get('href') or ''
+        for key, value in parse_qsl(urlsplit(href.replace('&amp;', '&')).query):
+            if key != 'family':
+                continue
+            name, _, axes = value.partition(':')
+            weights = []
+            if axes.startswith('wght@'):
+                weights = sorted(int(weight) for weight in axes[len('wght@'):].split(';') if weight.isdigit())
+            families[name] = (match.group(0), weights or [400])
+    return families
+
+
+def _declarations(body):
+    declarations = {}
+    for part in body.split(';'):
+        name, _, value = part.partition(':')
+        if value:
+            declarations[name.strip().lower()] = value.strip()
+    return declarations
+
+
+def _walk(nodes):
+    for node in nodes:
+        if isinstance(node, Rule):
+            yield node
+        elif isinstance(node, AtRule) and node.children is not None:
+            yield from _walk(node.children)
+
+
+def _first_family(value):
+    return value.split(',')[0].strip().strip('\'"')
+
+
+def used_weights(stylesheet, families, bold_tags_present):
+    # Weights each family needs; a family no rule refers to needs none. Rules
+    # without a font-family inherit the family of the body, so their weights
+    # count for the primary family.
+    primary = None
+    rules = list(_walk(parse_stylesheet(stylesheet)))
+    for rule in rules:
+        family = _declarations(rule.body).get('font-family')
+        if family and any(selector in ('body', 'html', ':root', '*') for selector in rule.selectors):
+            primary = _first_family(family)
+    weights = {name: set() for name in families}
+    if primary in weights:
+        weights[primary].add(400)
+    for rule in rules:
+        declarations = _declarations(rule.body)
+        weight = declarations.get('font-weight', '')
+        weight = WEIGHT_KEYWORDS.get(weight, int(weight) if weight.isdigit() else None)
+        family = _first_family(declarations['font-family']) if 'font-family' in declarations else primary
+        if family not in weights:
+            continue
+        weights[family].add(400)
+        if weight:
+            weights[family].add(weight)
+    if bold_tags_present:
+        for found in weights.values():
+            if found:
+                found.add(700)
+    return {name: sorted(found) for name, found in weights.items()}
+
+
+def source_files(source_dir):
+    # Font files in source_dir, in the order they are considered
+    if not os.path.isdir(source_dir):
+        return []
+    return [os.path.join(source_dir, name) for name in sorted(os.listdir(source_dir))
+            if name.lower().endswith(FONT_EXTENSIONS)]
+
+
+def find_sources(source_dir):
+    # {(family, weight): path} for static font files and {family: path} for
+    # variable fonts with a wght axis
+    from fontTools.ttLib import TTFont
+
+    static, variable = {}, {}
+    for path in source_files(source_dir):
+        with TTFont(path, lazy=True) as font:
+            names = font['name']
+            family = str(names.getDebugName(16) or names.getDebugName(1))
+            if 'fvar' in font and any(axis.axisTag == 'wght' for axis in font['fvar'].axes):
+                variable.setdefault(family, path)
+            elif 'OS/2' in font and 'italic' not in str(names.getDebugName(2)).lower():
+                static.setdefault((family, font['OS/2'].usWeightClass), path)
+    return static, variable
+
+
+def woff_flavor():
+    # WOFF2 needs the brotli package; plain WOFF is the fallback
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return 'woff'
+    return 'woff2'
+
+
+def subset_font(path, weight, text, is_variable, flavor):
+    import io
+
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    # Keep head.modified from the source so output bytes are reproducible
+    font = TTFont(path, recalcTimestamp=False)
+    if is_variable:
+        from fontTools.varLib import instancer
+
+        font = instancer.instantiateVariableFont(font, {'wght': weight})
+    options = subset.Options()
+    options.flavor = flavor
+    options.layout_features = ['*']
+    options.notdef_outline = True
+    # Tables fontTools cannot subset (FFTM and friends) are dropped quietly
+    logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font.flavor = flavor
+    font.save(buffer)
+    return buffer.getvalue()
+
+
+def _slug(family):
+    return re.sub(r'[^a-z0-9]+', '-', family.lower()).strip('-')
+
+
+def _trimmed_google_link(link, family, weights):
+    attrs = dict(parse_attrs(link.strip()))
+    parts = urlsplit(attrs['href'].replace('&amp;', '&'))
+    query = [(key, f"{family}:wght@{';'.join(str(w) for w in weights)}" if key == 'family' else value)
+             for key, value in parse_qsl(parts.query)]
+    href = urlunsplit(parts._replace(query=urlencode(query, safe=':@;')))
+    return link.replace(attrs['href'], href.replace('&', '&amp;') if '&amp;' in link else href)
+
+
+def self_host_fonts(html, stylesheet, source_dir, above_fold_stylesheet=None, max_preloads=3):
+    # Returns (html, assets, dependencies, report). Families the stylesheet
+    # never uses lose their link entirely.
+    families = google_families(html)
+    if not families:
+        return html, {}, {}, None
+    text = PageText()
+    text.feed(html)
+    text.close()
+    chars = ''.join(sorted(text.chars | {' '}))
+    needed = used_weights(stylesheet, families, bool(text.tags & BOLD_TAGS))
+
+    try:
+        static, variable = find_sources(source_dir)
+    except ImportError:
+        static, variable = {}, {}
+
+    flavor = woff_flavor()
+    assets, dependencies, faces, preloads = {}, {}, [], []
+    report = {'families': {}, 'characters': len(chars), 'flavor': flavor}
+    for family, (link, requested) in families.items():
+        # A used weight that is not requested is drawn from the closest
+        # requested one today; keep that one rather than have the browser
+        # synthesize from whatever else is left
+        weights = sorted({weight if weight in requested or not requested else
+                          min(requested, key=lambda candidate: (abs(candidate - weight), -candidate))
+                          for weight in needed[family]})
+        entry = {'requested': requested, 'used': weights, 'self_hosted': False}
+        report['families'][family] = entry
+        if not weights:
+            html = html.replace(link, '')
+            continue
+        sources = {weight: static.get((family, weight)) or variable.get(family) for weight in weights}
+        if not all(sources.values()):
+            html = html.replace(link, _trimmed_google_link(link, family, weights))
+            continue
+        entry['self_hosted'] = True
+        entry['bytes'] = 0
+        for weight, path in sorted(sources.items()):
+            with open(path, 'rb') as f:
+                dependencies[path] = hash_bytes(f.read())
+            data = subset_font(path, weight, chars, path == variable.get(family), flavor)
+            name = f'{ASSET_DIR}/{_slug(family)}-{weight}.{hash_bytes(data)[:10]}.{flavor}'
+            assets[name] = data
+            entry['bytes'] += len(data)
+            entry.setdefault('files', {})[weight] = name
+            faces.append(
+                f"@font-face {{font-family: '{family}'; font-style: normal; font-weight: {weight};"
+                f" font-display: swap; src: url('{name}') format('{flavor}');}}"
+            )
+        html = html.replace(link, '')
+
+    if faces:
+        head_end = HEAD_END_RE.search(html)
+        block = '    <style>\n' + '\n'.join(faces) + '\n    </style>\n'
+        html = html[:head_end.start()] + block + html[head_end.start():]
+        if above_fold_stylesheet:
+            html = preload_fonts(html, above_fold_stylesheet, report, max_preloads)
+    return html, assets, dependencies, report
+
+
+def preload_fonts(html, above_fold_stylesheet, report, max_preloads=3, root=''):
+    # Preloads the self-hosted files (see the self_host_fonts report) that
+    # the above-the-fold rules use, ahead of their @font-face block; root is
+    # the path from the page to the output directory
+    families = {family: entry for family, entry in report['families'].items() if entry.get('files')}
+    above_fold = used_weights(above_fold_stylesheet, families, False)
+    preloads = []
+    for family, entry in families.items():
+        for weight, name in entry['files'].items():
+            if weight in above_fold[family]:
+                # Regular weight first, then the rest in ascending order
+                preloads.append((weight != 400, weight, name))
+    tags = [
+        f'<link rel="preload" href="{root}{name}" as="font" type="font/{report["flavor"]}" crossorigin>'
+        for _, _, name in sorted(preloads)[:max_preloads]
+    ]
+    if not tags:
+        return html
+    faces = html.find('@font-face')
+    position = html.rfind('<style', 0, faces) if faces != -1 else -1
+    if position == -1:
+        position = HEAD_END_RE.search(html).start()
+    return html[:position] + ''.join(f'{tag}\n    ' for tag in tags) + html[position:]
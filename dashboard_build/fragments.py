@@ -0,0 +1,72 @@
+"""Hidden tab panes moved out of the page into separately cached fragments.
+
+Every ``.tab-content`` pane that is not active when the page loads (the
+Documentation tab and the dashboard tabs) has its body written to a
+content-hashed ``assets/fragments/<pane>.<hash>.html`` file.  The pane is
+left empty apart from a ``data-fragment`` attribute, which the tab runtime
+fetches and inserts the first time the tab is opened, and a ``<noscript>``
+link for visitors without scripts.  The link goes to a page of that tab when
+one is given, as the bare fragment has no stylesheet and its relative URLs
+only resolve from the page.  Panes holding a Looker embed keep its URL in
+``data-embed-src`` so tab prediction works before the fragment is loaded.
+"""
+import html as html_lib
+import re
+
+from dashboard_build.budgets import element_end
+from dashboard_build.manifest import hash_text
+from dashboard_build.markup import HEAD_END_RE, format_tag, parse_attrs, set_attr
+
+FRAGMENT_DIR = 'assets/fragments'
+
+PANE_RE = re.compile(r'<div\b[^>]*\bclass="tab-content\b[^"]*"[^>]*>', re.IGNORECASE)
+EMBED_SRC_RE = re.compile(r'\bdata-embed-src="([^"]*)"')
+# Without scripts the tabs cannot be switched, so every pane is shown
+NOSCRIPT_STYLE = '    <noscript><style>.tab-content { display: block; }</style></noscript>\n'
+
+
+def split_fragments(html, labels, links=None):
+    # Returns (html, assets, report); labels maps pane ids to the tab names
+    # used in the <noscript> links and links to their targets
+    assets = {}
+    fragments = {}
+    pieces = []
+    position = 0
+    for match in PANE_RE.finditer(html):
+        if match.start() < position:
+            continue
+        attrs = parse_attrs(match.group(0))
+        values = dict(attrs)
+        pane_id = values.get('id')
+        if not pane_id or 'active' in (values.get('class') or '').split():
+            continue
+        end = element_end(html, match.start(), 'div')
+        body = html[match.end():end - len('</div>')].strip()
+        if not body:
+            continue
+        path = f'{FRAGMENT_DIR}/{pane_id}.{hash_text(body)[:10]}.html'
+        assets[path] = (body + '\n').encode('utf-8')
+        fragments[pane_id] = {'path': path, 'bytes': len(assets[path])}
+
+        set_attr(attrs, 'data-fragment', path)
+        embed = EMBED_SRC_RE.search(body)
+        if embed:
+            set_attr(attrs, 'data-embed-src', embed.group(1))
+        label = html_lib.escape(labels.get(pane_id, pane_id))
+        pieces.append(html[position:match.start()])
+        href = (links or {}).get(pane_id, path)
+        pieces.append(f'{format_tag("div", attrs)}<noscript><a class="fragment-link" href="{href}">'
+                      f'Open {label}</a></noscript></div>')
+        position = end
+    if not fragments:
+        return html, {}, None
+    pieces.append(html[position:])
+    html = ''.join(pieces)
+    head_end = HEAD_END_RE.search(html)
+    if head_end:
+        html = html[:head_end.start()] + NOSCRIPT_STYLE + html[head_end.start():]
+    report = {
+        'fragments': fragments,
+        'fragment_bytes': sum(entry['bytes'] for entry in fragments.values()),
+    }
+    return html, assets, report
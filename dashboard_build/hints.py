@@ -0,0 +1,129 @@
+"""Resource hints for the third-party origins the page talks to.
+
+Origins are collected from the rendered page: stylesheets, scripts and
+images requested while the initial view paints (Google Fonts, cdnjs, the
+header logo), and the Looker Studio embeds that are only mounted when a tab
+is opened.  Origins of the initial view get ``preconnect``; embed origins
+and anything over the preconnect limit get the cheaper ``dns-prefetch``.
+Origins that already have a hint, and same-origin URLs, are skipped.
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from dashboard_build.markup import HEAD_END_RE
+
+DEFAULT_MAX_PRECONNECT = 4
+DEFAULT_MAX_DNS_PREFETCH = 8
+
+# Stylesheets on these origins pull their files from a second origin with
+# CORS, which needs its own crossorigin preconnect
+FOLLOW_UP_ORIGINS = {'https://fonts.googleapis.com': 'https://fonts.gstatic.com'}
+CORS_ORIGINS = {'https://fonts.gstatic.com'}
+
+HEAD_RESOURCE_RE = re.compile(r'[ \t]*<(?:link|style|script)\b|[ \t]*</head\s*>', re.IGNORECASE)
+
+
+def origin(url):
+    parts = urlsplit((url or '').strip())
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f'{parts.scheme}://{parts.netloc.lower()}'
+
+
+class PageOrigins(HTMLParser):
+    # Origins in first-request order: initial holds what the first paint
+    # fetches, deferred what is only loaded after a tab is opened
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.initial = []
+        self.deferred = []
+        self.hinted = set()
+        self.noscript = 0
+
+    def _add(self, bucket, url):
+        found = origin(url)
+        if found and found not in bucket:
+            bucket.append(found)
+
+    def handle_starttag(self, tag, attrs):
+        values = dict(attrs)
+        rel = (values.get('rel') or '').lower().split()
+        if tag == 'noscript':
+            self.noscript += 1
+        elif tag == 'link' and {'preconnect', 'dns-prefetch'} & set(rel):
+            found = origin(values.get('href'))
+            if found:
+                self.hinted.add(found)
+        elif tag == 'link' and {'stylesheet', 'preload', 'icon'} & set(rel):
+            self._add(self.initial, values.get('href'))
+        elif tag in ('script', 'img') and not self.noscript:
+            self._add(self.initial, values.get('src'))
+        if 'data-embed-src' in values:
+            self._add(self.deferred, values['data-embed-src'])
+        elif tag == 'iframe':
+            self._add(self.deferred, values.get('src'))
+
+    def handle_endtag(self, tag):
+        if tag == 'noscript' and self.noscript:
+            self.noscript -= 1
+
+
+def collect_origins(html):
+    parser = PageOrigins()
+    parser.feed(html)
+    parser.close()
+    initial = []
+    for found in parser.initial:
+        initial.append(found)
+        if found in FOLLOW_UP_ORIGINS:
+            initial.append(FOLLOW_UP_ORIGINS[found])
+    initial = [found for index, found in enumerate(initial) if found not in initial[:index]]
+    deferred = [found for found in parser.deferred if found not in initial]
+    return initial, deferred, parser.hinted
+
+
+def add_resource_hints(html, max_preconnect=DEFAULT_MAX_PRECONNECT, max_dns_prefetch=DEFAULT_MAX_DNS_PREFETCH):
+    # Returns (html, report)
+    initial, deferred, hinted = collect_origins(html)
+    initial = [found for found in initial if found not in hinted]
+    deferred = [found for found in deferred if found not in hinted]
+    preconnect = initial[:max_preconnect]
+    dns_prefetch = (initial[max_preconnect:] + deferred)[:max_dns_prefetch]
+    if not preconnect and not dns_prefetch:
+        return html, None
+
+    tags = [
+        f'<link rel="preconnect" href="{found}"{" crossorigin" if found in CORS_ORIGINS else ""}>'
+        for found in preconnect
+    ] + [f'<link rel="dns-prefetch" href="{found}">' for found in dns_prefetch]
+    # Hints go ahead of the first resource in <head> so they are seen first
+    head_end = HEAD_END_RE.search(html)
+    first = HEAD_RESOURCE_RE.search(html, 0, head_end.end() if head_end else len(html))
+    if not first:
+        return html, None
+    block = ''.join(f'    {tag}\n' for tag in tags)
+    html = html[:first.start()] + block + html[first.start():]
+    report = {
+        'preconnect': preconnect,
+        'dns_prefetch': dns_prefetch,
+        'dropped': (initial[max_preconnect:] + deferred)[max_dns_prefetch:],
+    }
+    return html, report
+
+
+def preconnect_origin(html, url):
+    # Upgrade the hint for the origin of url to preconnect, or add one; for
+    # a page whose first job is to load that url
+    found = origin(url)
+    if not found:
+        return html
+    tag = f'<link rel="preconnect" href="{found}">'
+    existing = re.search(rf'<link rel="(?:dns-prefetch|preconnect)" href="{re.escape(found)}">', html)
+    if existing:
+        return html[:existing.start()] + tag + html[existing.end():]
+    head_end = HEAD_END_RE.search(html)
+    first = HEAD_RESOURCE_RE.search(html, 0, head_end.end() if head_end else len(html))
+    if not first:
+        return html
+    return html[:first.start()] + f'    {tag}\n' + html[first.start():]
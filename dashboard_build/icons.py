@@ -0,0 +1,151 @@
+"""Tree-shaken SVG icon sprite replacing the Font Awesome stylesheet.
+
+Collects every ``fa-*`` icon used by the rendered page (element classes and
+names toggled from inline scripts), builds one inline ``<svg>`` sprite with
+a ``<symbol>`` per icon from the vendored Font Awesome Free SVGs, and puts
+an ``<svg><use>`` inside each ``<i class="fas fa-...">`` element.  The
+``<i>`` wrapper is kept so the existing ``.section-card h3 i`` style rules
+keep applying, and the Font Awesome stylesheet link is removed.
+"""
+import os
+import re
+
+from dashboard_build.css import SCRIPT_BLOCK_RE
+from dashboard_build.markup import HEAD_END_RE, format_tag, parse_attrs, set_attr
+
+DEFAULT_ICONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'icons', 'fontawesome')
+STYLE_PREFIXES = {'fas': 'solid', 'fa-solid': 'solid', 'far': 'regular', 'fa-regular': 'regular',
+                  'fab': 'brands', 'fa-brands': 'brands'}
+# Utility classes that are not icon names
+FA_MODIFIERS = {'fa-fw', 'fa-lg', 'fa-xs', 'fa-sm', 'fa-1x', 'fa-2x', 'fa-3x', 'fa-spin', 'fa-pulse', 'fa-border',
+                'fa-solid', 'fa-regular', 'fa-brands'}
+ATTRIBUTION = ('Font Awesome Free 5.15.4 by @fontawesome - https://fontawesome.com'
+               ' License - https://fontawesome.com/license/free (Icons: CC BY 4.0)')
+
+ICON_ELEMENT_RE = re.compile(r'<i\b[^>]*\bclass\s*=\s*"[^"]*\bfa-[^"]*"[^>]*>\s*</i>', re.IGNORECASE)
+FA_STYLESHEET_RE = re.compile(r'[ \t]*<link\b[^>]*font-?awesome[^>]*>\n?', re.IGNORECASE)
+SCRIPT_ICON_RE = re.compile(r'[\'"](fa-[a-z0-9-]+)[\'"]')
+SVG_RE = re.compile(r'<svg\b[^>]*viewBox="([^"]+)"[^>]*>(.*)</svg>', re.DOTALL)
+BODY_OPEN_RE = re.compile(r'<body\b[^>]*>', re.IGNORECASE)
+
+ICON_CSS = """
+        /* Inline SVG icons */
+        .icon {
+            display: inline-block;
+            font-style: normal;
+            line-height: 1;
+        }
+
+        .icon svg {
+            height: 1em;
+            width: auto;
+            overflow: visible;
+            vertical-align: -0.125em;
+            fill: currentColor;
+        }
+"""
+
+
+def icon_names(classes):
+    # (style, name) for the icon an element's class list refers to
+    style = next((STYLE_PREFIXES[cls] for cls in classes if cls in STYLE_PREFIXES), 'solid')
+    names = [cls[3:] for cls in classes if cls.startswith('fa-') and cls not in FA_MODIFIERS]
+    return style, names[0] if names else None
+
+
+def symbol_id(style, name):
+    # Solid icons, the only ones the page scripts swap, get the short id
+    return f'icon-{name}' if style == 'solid' else f'icon-{style}-{name}'
+
+
+def icon_files(icons_dir):
+    # Every vendored SVG, so the manifest notices added or edited icons
+    paths = []
+    for root, dirs, names in os.walk(icons_dir):
+        dirs.sort()
+        paths += [os.path.join(root, name) for name in sorted(names) if name.endswith('.svg')]
+    return paths
+
+
+def load_symbol(icons_dir, style, name):
+    path = os.path.join(icons_dir, style, f'{name}.svg')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except OSError:
+        return None, None
+    match = SVG_RE.search(source)
+    body = re.sub(r'<!--.*?-->', '', match.group(2), flags=re.DOTALL).strip()
+    return match.group(1), body
+
+
+def build_icon_sprite(html, icons_dir=DEFAULT_ICONS_DIR):
+    # Returns (html, report). Icons without a vendored SVG keep their plain
+    # <i> element and are listed as missing.
+    elements = []
+    wanted = set()
+    for match in ICON_ELEMENT_RE.finditer(html):
+        attrs = parse_attrs(re.match(r'<i\b[^>]*>', match.group(0)).group(0))
+        style, name = icon_names((dict(attrs).get('class') or '').split())
+        elements.append((match, attrs, style, name))
+        if name:
+            wanted.add((style, name))
+    # Icons swapped in by the inline scripts (dark mode, sidebar chevrons)
+    for script in SCRIPT_BLOCK_RE.findall(html):
+        for name in SCRIPT_ICON_RE.findall(script):
+            if name not in FA_MODIFIERS:
+                wanted.add(('solid', name[3:]))
+    if not elements:
+        return html, None
+
+    symbols = {}
+    missing = []
+    for style, name in sorted(wanted):
+        view_box, body = load_symbol(icons_dir, style, name)
+        if view_box is None:
+            missing.append(name)
+        else:
+            symbols[(style, name)] = (view_box, body)
+
+    pieces = []
+    position = 0
+    for match, attrs, style, name in elements:
+        pieces.append(html[position:match.start()])
+        position = match.end()
+        if (style, name) not in symbols:
+            pieces.append(match.group(0))
+            continue
+        classes = [cls for cls in (dict(attrs).get('class') or '').split() if cls not in STYLE_PREFIXES]
+        set_attr(attrs, 'class', ' '.join(['icon'] + classes))
+        set_attr(attrs, 'aria-hidden', 'true')
+        view_box = symbols[(style, name)][0]
+        pieces.append(
+            f'{format_tag("i", attrs)}<svg viewBox="{view_box}"><use href="#{symbol_id(style, name)}"></use></svg></i>'
+        )
+    pieces.append(html[position:])
+    html = ''.join(pieces)
+
+    sprite = ''.join(
+        f'<symbol id="{symbol_id(style, name)}" viewBox="{view_box}">{body}</symbol>'
+        for (style, name), (view_box, body) in sorted(symbols.items())
+    )
+    # Attribution lives in <metadata> rather than a comment so minification
+    # keeps it
+    sprite = (f'\n    <svg xmlns="http://www.w3.org/2000/svg" style="display:none" aria-hidden="true">'
+              f'<metadata>{ATTRIBUTION}</metadata>{sprite}</svg>')
+    body_open = BODY_OPEN_RE.search(html)
+    html = html[:body_open.end()] + sprite + html[body_open.end():]
+    html, removed_links = FA_STYLESHEET_RE.subn('', html)
+    # The icon rules ride along with the page styles so the stylesheet stage
+    # can extract them
+    html, styled = re.subn(r'</style>', lambda _: ICON_CSS + '    </style>', html, count=1)
+    if not styled:
+        html = HEAD_END_RE.sub(lambda _: f'    <style>{ICON_CSS}    </style>\n</head>', html, count=1)
+
+    report = {
+        'icons': sorted(name for _, name in symbols),
+        'missing': missing,
+        'sprite_bytes': len(sprite.encode('utf-8')),
+        'removed_stylesheets': removed_links,
+    }
+    return html, report
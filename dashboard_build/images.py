@@ -0,0 +1,304 @@
+"""Image extraction and optimization stage.
+
+Finds ``<img>`` elements in the rendered page whose source is an inline
+``data:`` URI or a local file, writes the image out as a content-hashed
+asset and, when Pillow is installed, re-encodes it to AVIF/WebP at several
+widths behind a ``<picture>`` element with ``srcset``/``sizes``.  Every
+rewritten image gets explicit ``width``/``height`` and ``decoding="async"``.
+Images marked ``data-lqip`` also get a tiny inline JPEG preview as their
+background, shown until the full image arrives.
+Encoded variants are cached on disk by source hash and settings, and
+encoding runs in a process pool when there is more than one image.  SVGs
+and animated GIFs are only copied, since re-encoding would rasterize or
+freeze them, and an image Pillow cannot read is copied with the error
+recorded in the report rather than failing the build.
+"""
+import base64
+import json
+import os
+import re
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from dashboard_build.manifest import CACHE_ROOT, hash_bytes, hash_text
+from dashboard_build.markup import format_tag, parse_attrs, set_attr
+
+DEFAULT_CACHE_DIR = os.path.join(CACHE_ROOT, 'images')
+DEFAULT_WIDTHS = (480, 960, 1600)
+DEFAULT_FORMATS = ('avif', 'webp')
+DEFAULT_QUALITY = 70
+ASSET_DIR = 'assets/img'
+LQIP_WIDTH = 24
+LQIP_QUALITY = 40
+
+MIME_EXTENSIONS = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/gif': 'gif', 'image/webp': 'webp',
+                   'image/svg+xml': 'svg'}
+FORMAT_MIME = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+DATA_URI_RE = re.compile(r'data:(image/[\w.+-]+);base64,(.*)', re.DOTALL)
+
+
+def image_size(data):
+    # Intrinsic (width, height) read from the file header, without Pillow
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', data[6:10])
+    if data[:2] == b'\xff\xd8':
+        offset = 2
+        while offset + 9 < len(data):
+            if data[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = data[offset + 1]
+            if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + struct.unpack('>H', data[offset + 2:offset + 4])[0]
+    return None
+
+
+def copy_only(data, ext):
+    # Vector images and animations, which must not be re-encoded
+    if ext == 'svg' or data.lstrip(b'\xef\xbb\xbf \t\r\n')[:1] == b'<':
+        return True
+    # A looping animation declares NETSCAPE2.0; any animation has a graphic
+    # control block per frame
+    return data[:6] in (b'GIF87a', b'GIF89a') and (b'NETSCAPE2.0' in data or data.count(b'\x21\xf9\x04') > 1)
+
+
+def try_encode(data, widths, formats, quality):
+    # encode_variants, or the error for a file Pillow cannot read; Pillow
+    # raises several unrelated exception types for corrupt input
+    try:
+        return encode_variants(data, widths, formats, quality), None
+    except Exception as exc:
+        return None, f'{type(exc).__name__}: {exc}'
+
+
+def pillow_formats(formats):
+    # Subset of the requested output formats this Pillow build can encode,
+    # or None when Pillow is not installed
+    try:
+        from PIL import features
+    except ImportError:
+        return None
+    return tuple(fmt for fmt in formats if features.check(fmt))
+
+
+def encode_variants(data, widths, formats, quality):
+    # Runs in a worker process. Returns (width, height, [(fmt, w, h, bytes)])
+    import io
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        width, height = image.size
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        targets = sorted({min(w, width) for w in widths})
+        variants = []
+        for fmt in formats:
+            for target in targets:
+                target_height = max(1, round(height * target / width))
+                resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=quality)
+                variants.append((fmt, target, target_height, buffer.getvalue()))
+    return width, height, variants
+
+
+def encode_lqip(data, width=LQIP_WIDTH, quality=LQIP_QUALITY):
+    # A few hundred bytes of JPEG; the browser's upscaling blurs it
+    import io
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGB')
+        height = max(1, round(image.height * width / image.width))
+        buffer = io.BytesIO()
+        image.resize((width, height), Image.BILINEAR).save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def cached_lqip(cache_dir, digest, data):
+    path = os.path.join(cache_dir, f'{digest[:16]}-lqip{LQIP_WIDTH}q{LQIP_QUALITY}.jpg')
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    preview = encode_lqip(data)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(preview)
+    return preview
+
+
+def load_cached(cache_dir, key):
+    try:
+        with open(os.path.join(cache_dir, key, 'variants.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        variants = []
+        for fmt, w, h, name in meta['variants']:
+            with open(os.path.join(cache_dir, key, name), 'rb') as f:
+                variants.append((fmt, w, h, f.read()))
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta['width'], meta['height'], variants
+
+
+def store_cached(cache_dir, key, encoded):
+    width, height, variants = encoded
+    directory = os.path.join(cache_dir, key)
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for fmt, w, h, data in variants:
+        name = f'{w}.{fmt}'
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(data)
+        names.append((fmt, w, h, name))
+    with open(os.path.join(directory, 'variants.json'), 'w', encoding='utf-8') as f:
+        json.dump({'width': width, 'height': height, 'variants': names}, f)
+
+
+def find_local(src, search_dirs):
+    path = src.split('?', 1)[0].split('#', 1)[0]
+    for directory in search_dirs:
+        candidate = os.path.join(directory, path)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def optimize_images(html, search_dirs, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS,
+                    quality=DEFAULT_QUALITY, cache_dir=DEFAULT_CACHE_DIR, max_workers=None):
+    # Returns (html, assets, dependencies, report). assets maps output-relative
+    # paths to bytes; dependencies maps local source files to their hashes.
+    sources = {}
+    tags = []
+    dependencies = {}
+    for match in IMG_TAG_RE.finditer(html):
+        attrs = parse_attrs(match.group(0))
+        src = dict(attrs).get('src') or ''
+        data_match = DATA_URI_RE.match(src.strip())
+        if data_match:
+            data = base64.b64decode(re.sub(r'\s+', '', data_match.group(2)))
+            stem, ext = 'inline', MIME_EXTENSIONS.get(data_match.group(1), 'bin')
+        elif src and not re.match(r'^([a-z][a-z0-9+.-]*:|//)', src, re.IGNORECASE):
+            path = find_local(src, search_dirs)
+            if path is None:
+                # Recorded as missing so adding the file later triggers a rebuild
+                dependencies[os.path.join(search_dirs[0], src.split('?', 1)[0].split('#', 1)[0])] = None
+                tags.append((match, attrs, None))
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            dependencies[path] = hash_bytes(data)
+            stem, ext = os.path.splitext(os.path.basename(path))
+            ext = ext.lstrip('.').lower() or 'bin'
+        else:
+            tags.append((match, attrs, None))
+            continue
+        digest = hash_bytes(data)
+        sources.setdefault(digest, (data, stem, ext))
+        tags.append((match, attrs, digest))
+
+    formats = pillow_formats(formats)
+    settings = hash_text(json.dumps([sorted(set(widths)), list(formats or ()), quality]))[:8]
+    encoded = {}
+    errors = {}
+    pending = []
+    for digest, (data, _, ext) in sources.items():
+        if formats and not copy_only(data, ext):
+            cached = load_cached(cache_dir, f'{digest[:16]}-{settings}')
+            if cached is None:
+                pending.append(digest)
+            else:
+                encoded[digest] = cached
+    if pending:
+        if len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {digest: pool.submit(try_encode, sources[digest][0], widths, formats, quality)
+                           for digest in pending}
+                results = {digest: future.result() for digest, future in futures.items()}
+        else:
+            results = {pending[0]: try_encode(sources[pending[0]][0], widths, formats, quality)}
+        for digest in pending:
+            result, error = results[digest]
+            if error:
+                # Not cached, so a fixed file or Pillow is picked up next time
+                errors[digest] = error
+                continue
+            store_cached(cache_dir, f'{digest[:16]}-{settings}', result)
+            encoded[digest] = result
+
+    # Previews need Pillow but not any of the modern formats
+    lqips = {}
+    if formats is not None:
+        for _, attrs, digest in tags:
+            if digest in encoded and 'data-lqip' in dict(attrs) and digest not in lqips:
+                lqips[digest] = cached_lqip(cache_dir, digest, sources[digest][0])
+
+    assets = {}
+    report = []
+    rewritten = {}
+    for digest, (data, stem, ext) in sorted(sources.items()):
+        fallback = f'{ASSET_DIR}/{stem}-{digest[:10]}.{ext}'
+        assets[fallback] = data
+        if digest in encoded:
+            width, height, variants = encoded[digest]
+        else:
+            width, height = image_size(data) or (None, None)
+            variants = []
+        srcsets = {}
+        for fmt, w, h, variant in variants:
+            name = f'{ASSET_DIR}/{stem}-{digest[:10]}-{w}.{fmt}'
+            assets[name] = variant
+            srcsets.setdefault(fmt, []).append(f'{name} {w}w')
+        rewritten[digest] = (fallback, width, height, srcsets)
+        report.append({
+            'name': fallback,
+            'source_bytes': len(data),
+            'variants': {fmt: len(entries) for fmt, entries in srcsets.items()},
+            'variant_bytes': sum(len(v[3]) for v in variants),
+        })
+        if digest in lqips:
+            report[-1]['lqip_bytes'] = len(lqips[digest])
+        if digest in errors:
+            report[-1]['error'] = errors[digest]
+
+    pieces = []
+    position = 0
+    for match, attrs, digest in tags:
+        pieces.append(html[position:match.start()])
+        position = match.end()
+        attrs = [(name, value) for name, value in attrs if name != 'data-lqip']
+        if digest is None:
+            if 'decoding' not in dict(attrs):
+                set_attr(attrs, 'decoding', 'async')
+            pieces.append(format_tag('img', attrs))
+            continue
+        fallback, width, height, srcsets = rewritten[digest]
+        set_attr(attrs, 'src', fallback)
+        if digest in lqips:
+            preview = base64.b64encode(lqips[digest]).decode('ascii')
+            set_attr(attrs, 'style', f"background-image: url('data:image/jpeg;base64,{preview}')")
+        if width and height:
+            set_attr(attrs, 'width', str(width))
+            set_attr(attrs, 'height', str(height))
+        set_attr(attrs, 'decoding', 'async')
+        if not srcsets:
+            pieces.append(format_tag('img', attrs))
+            continue
+        sizes = dict(attrs).get('sizes') or f'(max-width: {width}px) 100vw, {width}px'
+        sources_html = ''.join(
+            format_tag('source', [('type', FORMAT_MIME[fmt]), ('srcset', ', '.join(entries)), ('sizes', sizes)])
+            for fmt, entries in srcsets.items()
+        )
+        pieces.append(f'<picture>{sources_html}{format_tag("img", attrs)}</picture>')
+    pieces.append(html[position:])
+    return ''.join(pieces), assets, dependencies, report
@@ -0,0 +1,195 @@
+"""Content-hash build manifest.
+
+The manifest lives next to the generated site and records the hash of every
+build input and every emitted file, so a rerun with unchanged inputs can stop
+before importing Jinja or touching the output directory.  Every file is
+written to a temporary sibling, fsynced and renamed into place, so a server
+reading the output directory never sees a partial file.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+MANIFEST_NAME = '.build-manifest.json'
+MANIFEST_VERSION = 1
+
+# Root of the on-disk caches (compiled templates, encoded images);
+# DASHBOARD_BUILD_CACHE points a build at a different one
+CACHE_ROOT = os.environ.get('DASHBOARD_BUILD_CACHE') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text):
+    return hash_bytes(text.encode('utf-8'))
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def hash_files(paths, root):
+    # Combined hash of several files, stable regardless of argument order and
+    # of where the checkout lives on disk
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, root).replace(os.sep, '/').encode('utf-8'))
+        digest.update(b'\0')
+        digest.update((hash_file(path) or '').encode('ascii'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def portable_path(path):
+    # Paths under the working directory are recorded relative to it with
+    # forward slashes, so the manifest does not depend on the checkout location
+    relative = os.path.relpath(os.path.abspath(path))
+    if relative.startswith(os.pardir):
+        return path
+    return relative.replace(os.sep, '/')
+
+
+def new_manifest(inputs, outputs, dependencies=None, retained=None):
+    # dependencies records files discovered while building (images and other
+    # sources referenced from the rendered page) so edits to them are seen;
+    # retained lists outputs of the previous build left in place for now
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'inputs': dict(sorted(inputs.items())),
+        'dependencies': dict(sorted((portable_path(path), digest) for path, digest in (dependencies or {}).items())),
+        'outputs': dict(sorted(outputs.items())),
+    }
+    if retained:
+        manifest['retained'] = dict(sorted(retained.items()))
+    return manifest
+
+
+def save_manifest(out_dir, manifest):
+    data = (json.dumps(manifest, indent=2, sort_keys=True) + '\n').encode('utf-8')
+    return write_if_changed(os.path.join(out_dir, MANIFEST_NAME), data)
+
+
+def is_up_to_date(manifest, inputs, out_dir):
+    # Inputs must match exactly and every recorded output must still be on
+    # disk with the recorded content; a hand-edited or deleted output forces
+    # a rebuild.
+    if not manifest or manifest.get('inputs') != inputs:
+        return False
+    outputs = manifest.get('outputs') or {}
+    if not outputs:
+        return False
+    for name, digest in outputs.items():
+        if hash_file(os.path.join(out_dir, name)) != digest:
+            return False
+    for path, digest in (manifest.get('dependencies') or {}).items():
+        if hash_file(path) != digest:
+            return False
+    return True
+
+
+def retain_previous(manifest, outputs, prefix):
+    # Outputs under prefix that the previous build emitted and this one does
+    # not; outputs the previous build itself only retained are not kept again
+    previous = (manifest or {}).get('outputs') or {}
+    return {name: digest for name, digest in previous.items() if name.startswith(prefix) and name not in outputs}
+
+
+def remove_stale(out_dir, manifest, outputs):
+    # Delete files a previous build emitted or retained that this build no
+    # longer does
+    manifest = manifest or {}
+    previous = set(manifest.get('outputs') or {}) | set(manifest.get('retained') or {})
+    removed = []
+    for name in sorted(previous - set(outputs)):
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except OSError:
+            continue
+        removed.append(name)
+        # Directories left empty go too, such as the page of a removed tab
+        directory = os.path.dirname(name)
+        while directory:
+            try:
+                os.rmdir(os.path.join(out_dir, directory))
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+    return removed
+
+
+class AbortWrite(Exception):
+    # Raised inside atomic_open to discard the new file and keep the old one
+    pass
+
+
+@contextlib.contextmanager
+def atomic_open(path):
+    # Binary file object for a temporary file next to path; it replaces path
+    # when the block exits cleanly and is deleted otherwise
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; keep the mode a plain open() gives
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except AbortWrite:
+        os.remove(temp_path)
+        return
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # Persist the rename itself
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_if_changed(path, data):
+    # Leave identical files alone so mtimes and git status stay quiet
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with atomic_open(path) as f:
+        f.write(data)
+    return True
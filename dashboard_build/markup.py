@@ -0,0 +1,102 @@
+"""Small helpers for reading and rewriting the generated markup.
+
+Tag and attribute rewriting, the element-stack and DOM-token parsers the
+stages build on, and the patterns and names several stages share.
+"""
+import re
+from html.parser import HTMLParser
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+# Precompressed copies written next to an output; never a separate resource
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+DATA_URI_RE = re.compile(r'data:[\w/+.-]+;base64,[A-Za-z0-9+/=\s]+')
+ATTR_RE = re.compile(r'([^\s"\'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+TAG_NAME_RE = re.compile(r'^<\s*[\w-]+')
+
+
+def parse_attrs(tag):
+    # Ordered list of (name, value) pairs; value is None for bare attributes
+    body = TAG_NAME_RE.sub('', tag).rstrip('>').rstrip('/')
+    attrs = []
+    for match in ATTR_RE.finditer(body):
+        value = next((group for group in match.groups()[1:] if group is not None), None)
+        attrs.append((match.group(1).lower(), value))
+    return attrs
+
+
+def format_tag(name, attrs):
+    parts = [name]
+    for key, value in attrs:
+        parts.append(key if value is None else f'{key}="{value}"')
+    return '<' + ' '.join(parts) + '>'
+
+
+def set_attr(attrs, name, value):
+    for index, (key, _) in enumerate(attrs):
+        if key == name:
+            attrs[index] = (name, value)
+            return
+    attrs.append((name, value))
+
+
+def remove_attr(attrs, name):
+    attrs[:] = [(key, value) for key, value in attrs if key != name]
+
+
+class ElementStack(HTMLParser):
+    # Keeps the open elements in stack as (tag, attrs).  Subclasses handle
+    # start(), called before an element is pushed, and end(), called with
+    # its index in the stack as it is closed, explicitly or by the end tag
+    # of an ancestor
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+
+    def start(self, tag, attrs):
+        pass
+
+    def end(self, tag, attrs, depth):
+        pass
+
+    def handle_starttag(self, tag, attrs):
+        self.start(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.end(tag, attrs, len(self.stack) - 1)
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                for depth in range(len(self.stack) - 1, index - 1, -1):
+                    self.end(*self.stack[depth], depth)
+                del self.stack[index:]
+                return
+
+
+class DomTokens(ElementStack):
+    # Tag names, ids, classes and attribute names present in a document
+    def __init__(self):
+        super().__init__()
+        self.tags = set()
+        self.ids = set()
+        self.classes = set()
+        self.attributes = set()
+
+    def record(self, tag, attrs):
+        self.tags.add(tag)
+        for name, value in attrs:
+            self.attributes.add(name)
+            if name == 'id' and value:
+                self.ids.add(value)
+            elif name == 'class' and value:
+                self.classes.update(value.split())
+
+    def start(self, tag, attrs):
+        self.record(tag, attrs)
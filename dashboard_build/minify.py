@@ -0,0 +1,182 @@
+"""Deterministic HTML, CSS and JS minification.
+
+The transforms are deliberately conservative: whitespace inside ``<pre>``
+and ``<textarea>`` is preserved, whitespace between inline content is
+collapsed to a single space rather than removed, and scripts keep their
+line structure so automatic semicolon insertion behaves exactly as before.
+"""
+import re
+
+from dashboard_build.css import strip_comments
+
+# Elements around which whitespace never renders
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'br', 'dd', 'details', 'dialog', 'div', 'dl',
+    'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'head',
+    'header', 'hr', 'html', 'li', 'link', 'main', 'meta', 'nav', 'noscript', 'ol', 'p', 'script',
+    'section', 'source', 'style', 'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'title', 'tr', 'ul',
+    '!doctype',
+}
+
+RAW_BLOCK_RE = re.compile(r'<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r'<!--(?!\[if|<!|>).*?-->', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+TAG_NAME_RE = re.compile(r'</?\s*([!\w-]+)')
+CSS_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'')
+
+# Tokens after which a "/" starts a regular expression literal in JS
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^') | {''}
+
+
+def minify_css(css):
+    css = strip_comments(css)
+    pieces = []
+    position = 0
+    for match in CSS_STRING_RE.finditer(css):
+        pieces.append(_squeeze_css(css[position:match.start()]))
+        pieces.append(match.group(0))
+        position = match.end()
+    pieces.append(_squeeze_css(css[position:]))
+    return ''.join(pieces).strip()
+
+
+def _squeeze_css(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}')
+
+
+def minify_js(js):
+    # Drop comments and indentation but keep one statement per line. String,
+    # template and regex literals are copied verbatim.
+    out = []
+    i = 0
+    length = len(js)
+    previous = ''
+    while i < length:
+        char = js[i]
+        if char in '"\'`':
+            end = i + 1
+            while end < length and js[end] != char:
+                end += 2 if js[end] == '\\' else 1
+            out.append(js[i:end + 1])
+            previous = char
+            i = end + 1
+            continue
+        if js.startswith('//', i):
+            newline = js.find('\n', i)
+            i = length if newline == -1 else newline
+            continue
+        if js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            _append_space(out, ' ')
+            continue
+        if char == '/' and previous in JS_REGEX_PRECEDERS:
+            end = i + 1
+            in_class = False
+            while end < length and js[end] != '\n' and (in_class or js[end] != '/'):
+                if js[end] == '\\':
+                    end += 1
+                elif js[end] == '[':
+                    in_class = True
+                elif js[end] == ']':
+                    in_class = False
+                end += 1
+            out.append(js[i:end + 1])
+            previous = '/'
+            i = end + 1
+            continue
+        if char.isspace():
+            _append_space(out, '\n' if char in '\r\n' else ' ')
+        else:
+            out.append(char)
+            previous = char
+        i += 1
+    return ''.join(out).strip()
+
+
+def _append_space(out, space):
+    # Collapse runs of whitespace; a newline wins over spaces and trailing
+    # spaces before a newline are dropped
+    if not out:
+        return
+    last = out[-1]
+    if space == '\n':
+        while out and out[-1] == ' ':
+            out.pop()
+        if out and out[-1] != '\n':
+            out.append('\n')
+    elif last not in (' ', '\n'):
+        out.append(' ')
+
+
+def _tag_name(tag):
+    match = TAG_NAME_RE.match(tag)
+    return match.group(1).lower() if match else ''
+
+
+def _squeeze_tag(tag):
+    # Collapse whitespace between attributes, leaving quoted values alone
+    parts = re.split(r'("[^"]*"|\'[^\']*\')', tag)
+    for index in range(0, len(parts), 2):
+        parts[index] = re.sub(r'\s+', ' ', parts[index])
+    tag = ''.join(parts)
+    return re.sub(r'\s+(/?>)$', r'\1', tag)
+
+
+def _minify_raw(block):
+    name = _tag_name(block)
+    open_end = block.index('>') + 1
+    close_start = block.lower().rindex('</')
+    opening = _squeeze_tag(block[:open_end])
+    body = block[open_end:close_start]
+    if name == 'style':
+        body = minify_css(body)
+    elif name == 'script' and not re.search(r'\btype\s*=\s*["\']?(?!text/javascript|module)[\w/+-]', opening):
+        body = minify_js(body)
+    return opening + body + block[close_start:]
+
+
+def _tokens(html):
+    # Yields (kind, text, tag name) with kind one of 'text', 'tag' or 'raw'
+    position = 0
+    for raw in RAW_BLOCK_RE.finditer(html):
+        yield from _plain_tokens(html[position:raw.start()])
+        yield 'raw', raw.group(0), _tag_name(raw.group(0))
+        position = raw.end()
+    yield from _plain_tokens(html[position:])
+
+
+def _plain_tokens(text):
+    position = 0
+    for match in TAG_RE.finditer(text):
+        if match.start() > position:
+            yield 'text', text[position:match.start()], ''
+        yield 'tag', match.group(0), _tag_name(match.group(0))
+        position = match.end()
+    if position < len(text):
+        yield 'text', text[position:], ''
+
+
+def minify_html(html):
+    tokens = list(_tokens(COMMENT_RE.sub('', html)))
+    pieces = []
+    for index, (kind, text, name) in enumerate(tokens):
+        if kind == 'tag':
+            pieces.append(_squeeze_tag(text))
+        elif kind == 'raw':
+            pieces.append(_minify_raw(text) if name in ('script', 'style') else text)
+        else:
+            # Whitespace next to a block-level element cannot render; between
+            # inline content it is collapsed to a single space
+            text = re.sub(r'\s+', ' ', text)
+            before = tokens[index - 1][2] if index > 0 else '!doctype'
+            after = tokens[index + 1][2] if index + 1 < len(tokens) else 'html'
+            if before in BLOCK_TAGS or before == 'pre':
+                text = text.lstrip(' ')
+            if after in BLOCK_TAGS or after == 'pre':
+                text = text.rstrip(' ')
+            pieces.append(text)
+    return ''.join(pieces).strip() + '\n'
@@ -0,0 +1,173 @@
+"""One static page per tab, so every tab has its own bookmarkable URL.
+
+The finished single page is cut into a page per ``.tab-content`` pane: the
+Overview stays ``index.html`` and the Documentation and every dashboard tab
+get ``<slug>/index.html``.  Each page keeps the shared header, sidebar and
+stylesheet but only its own pane, shown as active.  The sidebar entries
+become real links to the other pages and the tab buttons carry the page URL
+in ``data-href``.  Relative asset URLs are rewritten on the pages one
+directory down, so every page references the same hashed assets.  A page
+whose pane holds a Looker embed preconnects to the embed's origin, since
+mounting it is the first thing the page does.
+"""
+import html as html_lib
+import re
+
+from dashboard_build.budgets import element_end
+from dashboard_build.fragments import EMBED_SRC_RE, PANE_RE
+from dashboard_build.hints import preconnect_origin
+from dashboard_build.markup import format_tag, parse_attrs, set_attr
+
+PAGE_NAME = 'index.html'
+# Top-level output directories a tab slug must not take over
+RESERVED_SLUGS = {'assets'}
+
+# Script and style blocks are matched whole so their content is never taken
+# for tags; every other match is a single start tag
+MARKUP_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>|<[a-zA-Z][\w-]*\b[^>]*>', re.IGNORECASE | re.DOTALL)
+TAB_TAG_RE = re.compile(r'<(a|button)\b[^>]*\bdata-tab=[^>]*>', re.IGNORECASE)
+TITLE_RE = re.compile(r'<title>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+SCHEME_RE = re.compile(r'^[a-zA-Z][\w+.-]*:')
+URL_ATTRIBUTES = ('src', 'href', 'data-fragment', 'poster')
+
+
+def slugify(label):
+    return re.sub(r'[^a-z0-9]+', '-', label.lower()).strip('-') or 'tab'
+
+
+def page_paths(panes):
+    # panes is [(pane id, label, slug or None)], the home pane first; returns
+    # {pane id: output path}.  Repeated slugs get a -2, -3 ... suffix.
+    paths = {}
+    taken = set(RESERVED_SLUGS)
+    for index, (pane_id, label, slug) in enumerate(panes):
+        if index == 0:
+            paths[pane_id] = PAGE_NAME
+            continue
+        base = slugify(slug or label)
+        slug, suffix = base, 2
+        while slug in taken:
+            slug, suffix = f'{base}-{suffix}', suffix + 1
+        taken.add(slug)
+        paths[pane_id] = f'{slug}/{PAGE_NAME}'
+    return paths
+
+
+def page_url(path, root):
+    # Directory URL of an output page as seen from a page root away from
+    # the output directory
+    return root + path[:-len(PAGE_NAME)] or './'
+
+
+def is_relative(url):
+    return bool(url) and not url.startswith(('#', '/', '?')) and not SCHEME_RE.match(url)
+
+
+def rebase_css(css, root):
+    def rebase(match):
+        quote, url = match.group(1), match.group(2).strip()
+        return f'url({quote}{root}{url}{quote})' if is_relative(url) else match.group(0)
+    return CSS_URL_RE.sub(rebase, css)
+
+
+def rebase_tag(tag, root):
+    attrs = parse_attrs(tag)
+    changed = False
+    for index, (name, value) in enumerate(attrs):
+        if value is None:
+            continue
+        if name in URL_ATTRIBUTES and is_relative(value):
+            value = root + value
+        elif name == 'srcset':
+            candidates = [candidate.strip() for candidate in value.split(',')]
+            value = ', '.join(root + candidate if is_relative(candidate) else candidate for candidate in candidates)
+        elif name == 'style':
+            value = rebase_css(value, root)
+        if value != attrs[index][1]:
+            attrs[index] = (name, value)
+            changed = True
+    if not changed:
+        return tag
+    return format_tag(re.match(r'<([\w-]+)', tag).group(1), attrs)
+
+
+def rebase_urls(html, root):
+    # Prefix every relative URL in tags and inline styles with root
+    def rebase(match):
+        text = match.group(0)
+        if not match.group(1):
+            return rebase_tag(text, root)
+        opening_end = text.index('>') + 1
+        body = text[opening_end:]
+        if match.group(1).lower() == 'style':
+            body = rebase_css(body, root)
+        return rebase_tag(text[:opening_end], root) + body
+    return MARKUP_RE.sub(rebase, html)
+
+
+def set_class(attrs, class_name, present):
+    classes = [name for name in (dict(attrs).get('class') or '').split() if name != class_name]
+    if present:
+        classes.append(class_name)
+    set_attr(attrs, 'class', ' '.join(classes))
+
+
+def link_tabs(html, paths, current, root):
+    # Point every sidebar link and tab button at its page and mark the ones
+    # for the current page active
+    def link(match):
+        attrs = parse_attrs(match.group(0))
+        target = dict(attrs).get('data-tab')
+        if target not in paths:
+            return match.group(0)
+        tag = match.group(1).lower()
+        set_attr(attrs, 'href' if tag == 'a' else 'data-href', page_url(paths[target], root))
+        if 'class' in dict(attrs):
+            set_class(attrs, 'active', target == current)
+        if tag == 'a' and target == current:
+            set_attr(attrs, 'aria-current', 'page')
+        return format_tag(tag, attrs)
+    return TAB_TAG_RE.sub(link, html)
+
+
+def activate_pane(pane):
+    opening = PANE_RE.match(pane)
+    attrs = parse_attrs(opening.group(0))
+    set_class(attrs, 'active', True)
+    return format_tag('div', attrs) + pane[opening.end():]
+
+
+def split_pages(html, paths, labels):
+    # Returns {output path: page}; paths comes from page_paths and labels
+    # maps pane ids to the names put in front of the title of their page
+    panes = []
+    for match in PANE_RE.finditer(html):
+        if panes and match.start() < panes[-1][2]:
+            continue
+        pane_id = dict(parse_attrs(match.group(0))).get('id')
+        if pane_id in paths:
+            panes.append((pane_id, match.start(), element_end(html, match.start(), 'div')))
+    pages = {}
+    for pane_id, _, _ in panes:
+        path = paths[pane_id]
+        pieces = []
+        position = 0
+        embed = None
+        for other, start, end in panes:
+            pieces.append(html[position:start])
+            if other == pane_id:
+                pieces.append(activate_pane(html[start:end]))
+                embed = EMBED_SRC_RE.search(html, start, end)
+            position = end
+        pieces.append(html[position:])
+        page = ''.join(pieces)
+        if embed:
+            page = preconnect_origin(page, embed.group(1))
+        root = '../' * path.count('/')
+        if root:
+            page = rebase_urls(page, root)
+            label = html_lib.escape(labels.get(pane_id, pane_id), quote=False)
+            page = TITLE_RE.sub(lambda match: f'<title>{label} | {match.group(1)}</title>', page, count=1)
+        pages[path] = link_tabs(page, paths, pane_id, root)
+    return pages
@@ -0,0 +1,85 @@
+"""Precompressed ``.gz`` and ``.br`` siblings for text outputs.
+
+Static servers such as nginx (``gzip_static``/``brotli_static``) can then
+send the precompressed file instead of compressing on every request.  Both
+encodings use their maximum level; gzip headers carry no timestamp so the
+variants are byte-for-byte stable.  Brotli variants need the optional
+``brotli`` package.  Variants whose source is unchanged since the previous
+build are reused from disk instead of being compressed again.
+"""
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from dashboard_build.manifest import hash_bytes, hash_file
+
+TEXT_EXTENSIONS = ('.html', '.css', '.js', '.mjs', '.json', '.svg', '.xml', '.txt', '.webmanifest')
+MIN_SIZE = 256
+
+# Below this many bytes in total the process pool costs more than it saves
+POOL_THRESHOLD = 256 * 1024
+
+
+def brotli_available():
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compress(data, encoding):
+    if encoding == 'gz':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    import brotli
+
+    return brotli.compress(data, quality=11, lgwin=24)
+
+
+def _compress_job(job):
+    name, encoding, data = job
+    return name, encoding, compress(data, encoding)
+
+
+def precompress(outputs, out_dir, previous_outputs, max_workers=None):
+    # Returns (variants, report); variants maps "<name>.gz"/"<name>.br" to
+    # bytes for every compressible entry of outputs
+    encodings = ['gz'] + (['br'] if brotli_available() else [])
+    previous_outputs = previous_outputs or {}
+    variants = {}
+    jobs = []
+    reused = 0
+    for name in sorted(outputs):
+        data = outputs[name]
+        if not name.endswith(TEXT_EXTENSIONS) or len(data) < MIN_SIZE:
+            continue
+        unchanged = previous_outputs.get(name) == hash_bytes(data)
+        for encoding in encodings:
+            variant = f'{name}.{encoding}'
+            path = os.path.join(out_dir, variant)
+            if unchanged and variant in previous_outputs and hash_file(path) == previous_outputs[variant]:
+                with open(path, 'rb') as f:
+                    variants[variant] = f.read()
+                reused += 1
+            else:
+                jobs.append((name, encoding, data))
+
+    if len(jobs) > 1 and sum(len(job[2]) for job in jobs) >= POOL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_compress_job, jobs))
+    else:
+        results = [_compress_job(job) for job in jobs]
+    for name, encoding, data in results:
+        variants[f'{name}.{encoding}'] = data
+
+    report = {
+        'encodings': encodings,
+        'compressed': len(results),
+        'reused': reused,
+        'files': {
+            name: {encoding: len(variants[f'{name}.{encoding}']) for encoding in encodings
+                   if f'{name}.{encoding}' in variants}
+            for name in sorted(outputs) if f'{name}.gz' in variants
+        },
+    }
+    return variants, report
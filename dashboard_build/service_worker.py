@@ -0,0 +1,151 @@
+"""Generated service worker for instant repeat visits.
+
+``sw.js`` precaches the shell assets the build emitted (the hashed
+stylesheet, fonts and tab fragments) and serves them cache-first; their
+names change whenever their content does.  Responsive image variants are
+not precached, since a browser only ever uses one of them; the one it picks
+is kept in the runtime cache instead.  Pages are served stale-while-
+revalidate: the cached copy paints at once and the network copy replaces it
+for the next visit.  Cross-origin stylesheets, fonts and images (Google
+Fonts, cdnjs, the header logo) get the same treatment from a runtime cache;
+every other cross-origin request, the Looker iframes included, is left to
+the browser.  The precache list is taken from the outputs of the same
+build, so it can never name a file that was not deployed, and the cache
+name is derived from it so an updated worker drops the old assets.  An
+updated worker waits until no page uses the old one: a cached page may
+still name the old fragments, which the old precache holds and the server
+no longer does.  Installing it also refreshes the cached pages, so the
+first page it serves matches its precache.
+"""
+import json
+
+from dashboard_build.images import ASSET_DIR as IMAGE_DIR
+from dashboard_build.manifest import hash_text
+from dashboard_build.markup import COMPRESSED_SUFFIXES
+
+SW_NAME = 'sw.js'
+CACHE_PREFIX = 'dashboard-'
+CROSS_ORIGIN_DESTINATIONS = ('style', 'font', 'image')
+
+BODY_END = '</body>'
+REGISTER_SCRIPT = ("<script>if ('serviceWorker' in navigator) window.addEventListener('load', "
+                   "() => navigator.serviceWorker.register('{url}', {{ scope: '{scope}' }}));</script>\n")
+
+SERVICE_WORKER_JS = """// Generated by the dashboard build; edits are overwritten
+const PRECACHE = '__PREFIX__precache-__VERSION__';
+const RUNTIME = '__PREFIX__runtime';
+const PRECACHE_URLS = __PRECACHE_URLS__;
+const PAGE_URLS = __PAGE_URLS__;
+const CROSS_ORIGIN_DESTINATIONS = __DESTINATIONS__;
+
+self.addEventListener('install', event => {
+    event.waitUntil(Promise.all([
+        caches.open(PRECACHE).then(cache => cache.addAll(PRECACHE_URLS)),
+        caches.open(RUNTIME).then(cache => cache.addAll(PAGE_URLS)),
+    ]));
+});
+
+// Only runs once no page is controlled by the previous worker, so nothing
+// can still ask for the assets in its precache
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys().then(names => Promise.all(
+        names.filter(name => name.startsWith('__PREFIX__') && name !== PRECACHE && name !== RUNTIME)
+            .map(name => caches.delete(name))
+    )));
+});
+
+// Answer from the runtime cache when possible and refresh it in the background
+function staleWhileRevalidate(event, key) {
+    return caches.open(RUNTIME).then(cache => cache.match(key).then(cached => {
+        const network = fetch(event.request).then(response => {
+            if (response.ok || response.type === 'opaque') cache.put(key, response.clone());
+            return response;
+        });
+        if (!cached) return network;
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }));
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        if (CROSS_ORIGIN_DESTINATIONS.includes(request.destination)) {
+            event.respondWith(staleWhileRevalidate(event, request));
+        }
+        return;
+    }
+    if (request.mode === 'navigate') {
+        // The query string and hash do not change the page
+        event.respondWith(staleWhileRevalidate(event, url.origin + url.pathname));
+        return;
+    }
+    event.respondWith(caches.match(request, { cacheName: PRECACHE })
+        .then(cached => cached || staleWhileRevalidate(event, request)));
+});
+"""
+
+
+def is_page(name):
+    return name == 'index.html' or name.endswith('/index.html')
+
+
+def precache_urls(outputs):
+    return sorted(name for name in outputs
+                  if name != SW_NAME and not is_page(name) and not name.endswith(COMPRESSED_SUFFIXES)
+                  and not name.startswith(f'{IMAGE_DIR}/'))
+
+
+def page_urls(outputs):
+    # Directory URLs, the form pages are linked and bookmarked by
+    return sorted('./' + name[:-len('index.html')] for name in outputs if is_page(name))
+
+
+def service_worker_script(outputs, minify=False):
+    precache = precache_urls(outputs)
+    pages = page_urls(outputs)
+    version = hash_text(json.dumps([precache, pages]))[:10]
+    script = SERVICE_WORKER_JS
+    for placeholder, value in (
+        ('__PREFIX__', CACHE_PREFIX),
+        ('__VERSION__', version),
+        ('__PRECACHE_URLS__', json.dumps(precache)),
+        ('__PAGE_URLS__', json.dumps(pages)),
+        ('__DESTINATIONS__', json.dumps(list(CROSS_ORIGIN_DESTINATIONS))),
+    ):
+        script = script.replace(placeholder, value)
+    if minify:
+        from dashboard_build.minify import minify_js
+
+        script = minify_js(script)
+    return script, version
+
+
+def register_service_worker(html, root='./'):
+    # root is the path from the page to the output directory, where sw.js
+    # lives; every page registers the same worker for the whole site
+    snippet = REGISTER_SCRIPT.format(url=f'{root}{SW_NAME}', scope=root)
+    position = html.rfind(BODY_END)
+    if position == -1:
+        return html + snippet
+    return html[:position] + snippet + html[position:]
+
+
+def add_service_worker(html, outputs, pages=None, minify=False):
+    # Returns (html, pages, assets, report).  html is the page written as
+    # index.html, pages any other pages by output path and outputs the rest
+    # of the build's outputs
+    pages = pages or {}
+    names = sorted(set(outputs) | set(pages) | {'index.html'})
+    script, version = service_worker_script(names, minify)
+    precache = precache_urls(names)
+    report = {
+        'version': version,
+        'precached': len(precache),
+        'precache_bytes': sum(len(outputs[name]) for name in precache),
+        'pages': page_urls(names),
+    }
+    pages = {path: register_service_worker(page, '../' * path.count('/') or './') for path, page in pages.items()}
+    return register_service_worker(html), pages, {SW_NAME: script.encode('utf-8')}, report
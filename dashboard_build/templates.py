@@ -0,0 +1,161 @@
+"""Ahead-of-time compiled Jinja templates and a fragment render cache.
+
+The page template lives under ``templates/``: ``index.html`` includes the
+partials in ``templates/partials/`` and imports the macros in
+``macros.html``.  Template sources are compiled once into plain Python modules with
+``Environment.compile_templates`` and stored under a directory named after
+the hash of the sources and the Jinja version.  Later builds load those
+modules through ``ModuleLoader`` and render directly, without lexing,
+parsing or compiling the template again.  Loaded templates are also kept
+per process, so a worker rendering several sites loads them only once.
+
+The per-tab markup (sidebar link, tab button, tab pane) is rendered through
+``fragment()`` for blocks of ``TAB_BLOCK_SIZE`` tabs, keyed by the macro and
+a hash of the block's tabs.  Rendered fragments are kept between builds of
+the same output directory, so editing one tab re-renders only the block
+holding it; hashing per block rather than per tab keeps a fully cached
+render cheaper than rendering the loops outright.
+"""
+import json
+import os
+import shutil
+import time
+
+from dashboard_build.manifest import CACHE_ROOT, atomic_open, hash_text
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+DEFAULT_CACHE_DIR = os.path.join(CACHE_ROOT, 'templates')
+DEFAULT_FRAGMENT_CACHE_DIR = os.path.join(CACHE_ROOT, 'fragments')
+# Dashboard tabs per cached fragment: an edited tab re-renders its block only
+TAB_BLOCK_SIZE = 64
+
+# (module_dir, name) -> template loaded by this process
+_loaded = {}
+
+
+def template_files(template_dir=DEFAULT_TEMPLATE_DIR):
+    paths = []
+    for root, dirs, names in os.walk(template_dir):
+        dirs.sort()
+        paths += [os.path.join(root, name) for name in sorted(names)]
+    return paths
+
+
+def read_sources(template_dir=DEFAULT_TEMPLATE_DIR):
+    # Template name (path under template_dir, with forward slashes) -> source
+    sources = {}
+    for path in template_files(template_dir):
+        with open(path, 'r', encoding='utf-8') as f:
+            sources[os.path.relpath(path, template_dir).replace(os.sep, '/')] = f.read()
+    return sources
+
+
+def cache_key(sources):
+    import jinja2
+
+    parts = [f'jinja2={jinja2.__version__}']
+    for name in sorted(sources):
+        parts.append(f'{name}\0{hash_text(sources[name])}')
+    return hash_text('\n'.join(parts))[:16]
+
+
+def precompile(sources, cache_dir=DEFAULT_CACHE_DIR):
+    # Returns (module_dir, compiled_now)
+    from jinja2 import DictLoader, Environment
+
+    target = os.path.join(cache_dir, cache_key(sources))
+    if os.path.isdir(target):
+        return target, False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = f'{target}.tmp-{os.getpid()}'
+    env = Environment(loader=DictLoader(sources))
+    env.compile_templates(staging, zip=None, ignore_errors=False)
+    try:
+        os.rename(staging, target)
+    except OSError:
+        # Another build published the same key first; its modules are identical
+        shutil.rmtree(staging, ignore_errors=True)
+    return target, True
+
+
+def load_template(name, sources, cache_dir=DEFAULT_CACHE_DIR):
+    # Returns (template, timings) where timings holds milliseconds spent
+    # importing Jinja, compiling (cache miss only) and loading the module.
+    timings = {}
+    started = time.perf_counter()
+    from jinja2 import Environment, ModuleLoader
+    timings['import_jinja_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    module_dir, compiled = precompile(sources, cache_dir)
+    timings['compile_ms'] = (time.perf_counter() - started) * 1000 if compiled else 0.0
+
+    started = time.perf_counter()
+    template = _loaded.get((module_dir, name))
+    if template is None:
+        env = Environment(loader=ModuleLoader(module_dir))
+        template = _loaded[(module_dir, name)] = env.get_template(name)
+    timings['load_ms'] = (time.perf_counter() - started) * 1000
+    timings['cache_hit'] = not compiled
+    return template, timings
+
+
+def tab_blocks(tabs, size=TAB_BLOCK_SIZE):
+    # Dashboard tabs in runs of `size`, each hashed once; start is the
+    # 1-based index of the block's first tab
+    blocks = []
+    for offset in range(0, len(tabs), size):
+        chunk = tabs[offset:offset + size]
+        key = hash_text(json.dumps([offset, chunk], sort_keys=True))[:24]
+        blocks.append({'start': offset + 1, 'tabs': chunk, 'key': key})
+    return blocks
+
+
+class FragmentCache:
+    # Rendered fragments of one output directory for one set of template
+    # sources. The store is rewritten with only the fragments the last render
+    # used, so removed tabs do not linger in it.
+    def __init__(self, sources, out_dir, cache_dir=DEFAULT_FRAGMENT_CACHE_DIR):
+        self.path = os.path.join(cache_dir, f'{hash_text(os.path.abspath(out_dir))[:16]}.json')
+        self.templates = cache_key(sources)
+        self.entries = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        if isinstance(stored, dict) and stored.get('templates') == self.templates:
+            self.entries = stored.get('fragments') or {}
+
+    def renderer(self, env):
+        # The fragment() function templates call as
+        # {{ fragment('partials/tabs.html', 'tab_panes', block) }}
+        # with a block from tab_blocks(); the macro only sees the block, so
+        # the block's hash is the whole key.
+        modules = {}
+
+        def fragment(template_name, macro_name, block):
+            key = f"{template_name}:{macro_name}:{block['key']}"
+            html = self.entries.get(key)
+            if html is None:
+                if template_name not in modules:
+                    modules[template_name] = env.get_template(template_name).module
+                html = str(getattr(modules[template_name], macro_name)(block))
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.used[key] = html
+            return html
+        return fragment
+
+    def save(self):
+        if self.used == self.entries:
+            return False
+        data = json.dumps({'templates': self.templates, 'fragments': self.used}, ensure_ascii=False)
+        with atomic_open(self.path) as f:
+            f.write(data.encode('utf-8'))
+        return True
@@ -0,0 +1,334 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Tab Navigation
+    const navLinks = document.querySelectorAll('.nav-link');
+    const tabButtons = document.querySelectorAll('.tab-btn');
+    const tabContents = document.querySelectorAll('.tab-content');
+
+    // Looker embeds are only created when their tab is first opened, and
+    // at most maxLiveEmbeds stay mounted (0 means no limit). The least
+    // recently used embed is unloaded and its placeholder shown again.
+    const maxLiveEmbeds = {{ max_live_embeds }};
+    const liveEmbeds = [];
+
+    function mountEmbed(wrapper) {
+        const iframe = document.createElement('iframe');
+        iframe.src = wrapper.dataset.embedSrc;
+        iframe.title = wrapper.dataset.embedTitle;
+        iframe.setAttribute('sandbox', 'allow-same-origin allow-scripts allow-popups allow-forms allow-storage-access-by-user-activation');
+        iframe.setAttribute('allow', 'fullscreen; clipboard-write; encrypted-media;');
+        iframe.addEventListener('load', function() {
+            if (speculativeEmbed === wrapper) speculativeEmbed = null;
+            wrapper.classList.add('embed-loaded');
+        });
+        wrapper.querySelector('.embed-placeholder-text').textContent = 'Loading ' + wrapper.dataset.embedTitle + '…';
+        wrapper.appendChild(iframe);
+        wrapper.classList.add('embed-live');
+    }
+
+    function unmountEmbed(wrapper) {
+        const iframe = wrapper.querySelector('iframe');
+        if (iframe) iframe.remove();
+        if (speculativeEmbed === wrapper) speculativeEmbed = null;
+        wrapper.classList.remove('embed-live', 'embed-loaded');
+        wrapper.querySelector('.embed-placeholder-text').textContent =
+            wrapper.dataset.embedTitle + ' was unloaded to free memory and reloads when this tab is opened.';
+    }
+
+    function onScreen(wrapper) {
+        const tabContent = wrapper.closest('.tab-content');
+        return !!tabContent && tabContent.classList.contains('active');
+    }
+
+    // Mount the embed if needed and mark it most recently used. A
+    // speculative mount does not count as use until its tab is opened, so
+    // it is the first to go; the embed on screen is never unloaded.
+    function useEmbed(wrapper, speculative) {
+        const index = liveEmbeds.indexOf(wrapper);
+        if (index === -1) {
+            mountEmbed(wrapper);
+        } else {
+            liveEmbeds.splice(index, 1);
+        }
+        if (speculative) {
+            liveEmbeds.unshift(wrapper);
+        } else {
+            liveEmbeds.push(wrapper);
+        }
+        for (let i = 0; maxLiveEmbeds > 0 && liveEmbeds.length > maxLiveEmbeds && i < liveEmbeds.length;) {
+            if (liveEmbeds[i] === wrapper || onScreen(liveEmbeds[i])) {
+                i++;
+            } else {
+                unmountEmbed(liveEmbeds.splice(i, 1)[0]);
+            }
+        }
+    }
+
+    // Panes built with lazy_tabs hold only a data-fragment URL until the
+    // tab is first opened or warmed; each body is fetched once
+    const fragments = new Map();
+
+    function loadFragment(tabContent) {
+        const url = tabContent.dataset.fragment;
+        if (!url) return Promise.resolve(tabContent);
+        if (!fragments.has(url)) {
+            fragments.set(url, fetch(url).then(response => {
+                if (!response.ok) throw new Error(url + ': HTTP ' + response.status);
+                return response.text();
+            }).then(html => {
+                tabContent.innerHTML = html;
+                tabContent.removeAttribute('data-fragment');
+                return tabContent;
+            }).catch(error => {
+                // Forget the failure so opening the tab again retries
+                fragments.delete(url);
+                throw error;
+            }));
+        }
+        return fragments.get(url);
+    }
+
+    function showFragmentError(tabContent) {
+        const link = document.createElement('a');
+        link.href = tabContent.dataset.fragment;
+        link.textContent = 'open it on its own';
+        const message = document.createElement('p');
+        message.append('This tab could not be loaded. Try again or ', link, '.');
+        tabContent.replaceChildren(message);
+    }
+
+    // Warm the tab the user is likely to open next: pre-mount its embed
+    // on hover or focus of its link, and once the page is idle for the
+    // tab opened most often. Only one speculative embed loads at a time.
+    const prefetchTabs = {{ 'true' if prefetch_tabs else 'false' }};
+    const historyKey = 'dashboard-tab-history';
+    const preconnected = new Set();
+    let speculativeEmbed = null;
+
+    function preconnect(url) {
+        const origin = new URL(url, location.href).origin;
+        if (preconnected.has(origin)) return;
+        preconnected.add(origin);
+        const link = document.createElement('link');
+        link.rel = 'preconnect';
+        link.href = origin;
+        document.head.appendChild(link);
+    }
+
+    // Multipage builds link tabs to their own pages, fetched ahead instead
+    const prefetchedPages = new Set();
+
+    function prefetchPage(url) {
+        if (!url || prefetchedPages.has(url)) return;
+        prefetchedPages.add(url);
+        const link = document.createElement('link');
+        link.rel = 'prefetch';
+        link.href = url;
+        document.head.appendChild(link);
+    }
+
+    function warmTab(tabId) {
+        if (!prefetchTabs || !tabId) return;
+        if (navigator.connection && navigator.connection.saveData) return;
+        const tabContent = document.getElementById(tabId);
+        if (!tabContent) {
+            const link = document.querySelector(`.nav-link[data-tab="${tabId}"]`);
+            if (link) prefetchPage(link.href);
+            return;
+        }
+        loadFragment(tabContent).then(
+            loaded => warmEmbed(loaded.querySelector('.dashboard-iframe-wrapper[data-embed-src]')),
+            () => {}
+        );
+    }
+
+    function warmEmbed(wrapper) {
+        if (!wrapper || liveEmbeds.includes(wrapper)) return;
+        preconnect(wrapper.dataset.embedSrc);
+        // With a single live embed, pre-mounting would unload the one on screen
+        if (speculativeEmbed || maxLiveEmbeds === 1) return;
+        speculativeEmbed = wrapper;
+        useEmbed(wrapper, true);
+    }
+
+    // Visit counts per embed URL, so reordering config tabs keeps history
+    function readHistory() {
+        try {
+            return JSON.parse(localStorage.getItem(historyKey)) || {};
+        } catch (e) {
+            return {};
+        }
+    }
+
+    function recordVisit(wrapper) {
+        const history = readHistory();
+        history[wrapper.dataset.embedSrc] = (history[wrapper.dataset.embedSrc] || 0) + 1;
+        try {
+            localStorage.setItem(historyKey, JSON.stringify(history));
+        } catch (e) {
+            // Storage disabled or full; prediction just stays off
+        }
+    }
+
+    // A pane whose fragment is not loaded yet carries its embed URL itself
+    function likelyTab() {
+        const history = readHistory();
+        let best = null;
+        let bestVisits = 0;
+        tabContents.forEach(tabContent => {
+            const wrapper = tabContent.querySelector('.dashboard-iframe-wrapper[data-embed-src]');
+            const visits = history[tabContent.dataset.embedSrc || (wrapper && wrapper.dataset.embedSrc)] || 0;
+            if (visits > bestVisits) {
+                best = tabContent;
+                bestVisits = visits;
+            }
+        });
+        return best;
+    }
+
+    function touchEmbed(tabContent) {
+        const wrapper = tabContent.querySelector('.dashboard-iframe-wrapper[data-embed-src]');
+        if (!wrapper) return;
+        if (speculativeEmbed === wrapper) speculativeEmbed = null;
+        recordVisit(wrapper);
+        useEmbed(wrapper);
+    }
+
+    function setActiveTab(tabId) {
+        // Hide all tab contents
+        tabContents.forEach(content => {
+            content.classList.remove('active');
+        });
+
+        // Deactivate all buttons
+        tabButtons.forEach(btn => {
+            btn.classList.remove('active');
+            btn.setAttribute('aria-selected', 'false');
+        });
+
+        // Deactivate all nav links
+        navLinks.forEach(link => {
+            link.classList.remove('active');
+        });
+
+        // Activate selected tab
+        const selectedContent = document.getElementById(tabId);
+        const selectedTabBtn = document.querySelector(`.tab-btn[data-tab="${tabId}"]`);
+        const selectedNavLink = document.querySelector(`.nav-link[data-tab="${tabId}"]`);
+
+        if (selectedContent) {
+            selectedContent.classList.add('active');
+            loadFragment(selectedContent).then(loaded => {
+                // The user may have moved on while the fragment loaded
+                if (loaded.classList.contains('active')) touchEmbed(loaded);
+            }, () => showFragmentError(selectedContent));
+        }
+        if (selectedTabBtn) {
+            selectedTabBtn.classList.add('active');
+            selectedTabBtn.setAttribute('aria-selected', 'true');
+        }
+        if (selectedNavLink) selectedNavLink.classList.add('active');
+    }
+
+    // Add click handlers to nav links; a tab on another page is a plain link
+    navLinks.forEach(link => {
+        link.addEventListener('click', function(e) {
+            const tabId = this.getAttribute('data-tab');
+            if (!document.getElementById(tabId)) return;
+            e.preventDefault();
+            setActiveTab(tabId);
+        });
+    });
+
+    // Add click handlers to tab buttons
+    tabButtons.forEach(button => {
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+            const tabId = this.getAttribute('data-tab');
+            if (document.getElementById(tabId)) {
+                setActiveTab(tabId);
+            } else if (this.dataset.href) {
+                location.href = this.dataset.href;
+            }
+        });
+    });
+
+    // Hover intent: a short delay skips links the pointer only passes over
+    document.querySelectorAll('.nav-link, .tab-btn').forEach(link => {
+        let hoverTimer = null;
+        link.addEventListener('mouseenter', function() {
+            hoverTimer = setTimeout(() => warmTab(link.getAttribute('data-tab')), 65);
+        });
+        link.addEventListener('mouseleave', function() {
+            clearTimeout(hoverTimer);
+        });
+        link.addEventListener('focus', function() {
+            warmTab(link.getAttribute('data-tab'));
+        });
+        link.addEventListener('touchstart', function() {
+            warmTab(link.getAttribute('data-tab'));
+        }, { passive: true });
+    });
+
+    // A page opened on a dashboard tab mounts its embed straight away
+    const activeContent = document.querySelector('.tab-content.active');
+    if (activeContent) touchEmbed(activeContent);
+
+    const whenIdle = window.requestIdleCallback || (callback => setTimeout(callback, 2000));
+    window.addEventListener('load', function() {
+        whenIdle(() => {
+            const likely = likelyTab();
+            if (likely) warmTab(likely.id);
+        });
+    });
+
+    // Swap a Font Awesome icon; sprite icons also need their <use> retargeted
+    function swapIcon(icon, from, to) {
+        icon.classList.remove(from);
+        icon.classList.add(to);
+        const svg = icon.querySelector('svg');
+        const symbol = document.getElementById('icon-' + to.slice(3));
+        if (svg && symbol) {
+            svg.setAttribute('viewBox', symbol.getAttribute('viewBox'));
+            svg.querySelector('use').setAttribute('href', '#icon-' + to.slice(3));
+        }
+    }
+
+    // Sidebar Collapse
+    const collapseBtn = document.querySelector('.collapse-btn');
+    const sidebar = document.querySelector('.sidebar');
+
+    collapseBtn.addEventListener('click', function() {
+        sidebar.classList.toggle('sidebar-collapsed');
+
+        // Toggle icon direction
+        const icon = this.querySelector('i');
+        if (sidebar.classList.contains('sidebar-collapsed')) {
+            swapIcon(icon, 'fa-chevron-left', 'fa-chevron-right');
+        } else {
+            swapIcon(icon, 'fa-chevron-right', 'fa-chevron-left');
+        }
+    });
+
+    // Dark Mode Toggle
+    const darkModeToggle = document.getElementById('dark-mode-toggle');
+    const body = document.body;
+
+    darkModeToggle.addEventListener('click', function() {
+        body.classList.toggle('dark-mode');
+        const icon = this.querySelector('i');
+
+        if (body.classList.contains('dark-mode')) {
+            swapIcon(icon, 'fa-moon', 'fa-sun');
+            // Apply dark mode styles
+            document.documentElement.style.setProperty('--neutral-50', '#0F172A');
+            document.documentElement.style.setProperty('--neutral-100', '#1E293B');
+            document.documentElement.style.setProperty('--neutral-900', '#F8FAFC');
+        } else {
+            swapIcon(icon, 'fa-sun', 'fa-moon');
+            // Restore light mode styles
+            document.documentElement.style.setProperty('--neutral-50', '#F8FAFC');
+            document.documentElement.style.setProperty('--neutral-100', '#F1F5F9');
+            document.documentElement.style.setProperty('--neutral-900', '#0F172A');
+        }
+    });
+});